@@ -9,19 +9,18 @@ to sub-modules for transport, tracks, devices, etc.
 import asyncio
 import threading
 from dataclasses import dataclass, field
-from typing import Any, Optional, TYPE_CHECKING
+from typing import Any, Optional
 
 from pythonosc import udp_client
 from pythonosc.dispatcher import Dispatcher
 from pythonosc.osc_server import BlockingOSCUDPServer
 
-if TYPE_CHECKING:
-    from .transport import TransportController
-    from .tracks import TrackController
-    from .devices import DeviceController
+from .transport import TransportController
+from .tracks import TrackController
+from .devices import DeviceController
 
 
-@dataclass
+@dataclass(slots=True)
 class AbletonConfig:
     """Configuration for Ableton connection."""
     host: str = "127.0.0.1"
@@ -30,7 +29,7 @@ class AbletonConfig:
     timeout: float = 0.5  # Seconds to wait for response (local OSC is fast)
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionState:
     """Mirrors the current state of the Ableton session."""
     connected: bool = False
@@ -40,6 +39,12 @@ class SessionState:
     track_count: int = 0
 
 
+def _resolve(future: asyncio.Future, result: tuple):
+    """Complete a response future (scheduled on its loop from the OSC thread)."""
+    if not future.done():
+        future.set_result(result)
+
+
 class AbletonClient:
     """
     Main client for communicating with Ableton Live via AbletonOSC.
@@ -60,6 +65,12 @@ class AbletonClient:
         client.disconnect()
     """
 
+    __slots__ = (
+        "config", "state", "transport", "tracks", "devices",
+        "_osc_client", "_osc_server", "_server_thread",
+        "_response_queue", "_queue_lock", "_dispatcher",
+    )
+
     def __init__(self, config: AbletonConfig = None):
         self.config = config or AbletonConfig()
         self._osc_client: Optional[udp_client.SimpleUDPClient] = None
@@ -67,14 +78,16 @@ class AbletonClient:
         self._server_thread: Optional[threading.Thread] = None
 
         self.state = SessionState()
-        self._response_queue: dict[str, asyncio.Future] = {}
+        # Pending requests per response address, oldest first: (sent args, future)
+        self._response_queue: dict[str, list[tuple[tuple, asyncio.Future]]] = {}
+        self._queue_lock = threading.Lock()  # responses arrive on the server thread
         self._dispatcher = Dispatcher()
         self._setup_dispatcher()
 
-        # Controllers (initialized lazily)
-        self._transport: Optional["TransportController"] = None
-        self._tracks: Optional["TrackController"] = None
-        self._devices: Optional["DeviceController"] = None
+        # Sub-controllers (built once; touched on every command)
+        self.transport = TransportController(self)
+        self.tracks = TrackController(self)
+        self.devices = DeviceController(self)
 
     def _setup_dispatcher(self):
         """Configure OSC message handlers."""
@@ -84,11 +97,26 @@ class AbletonClient:
         self._dispatcher.map("/live/error", self._handle_error)
 
     def _handle_response(self, address: str, *args):
-        """Generic response handler - resolves waiting futures."""
-        if address in self._response_queue:
-            future = self._response_queue.pop(address)
-            if not future.done():
-                future.set_result(args)
+        """Generic response handler - resolves the matching waiting future."""
+        with self._queue_lock:
+            waiters = self._response_queue.get(address)
+            if not waiters:
+                return
+
+            # AbletonOSC echoes the request's leading args (track/device index)
+            # back, so concurrent requests to one address are told apart by that;
+            # anything else goes to the oldest waiter
+            match = 0
+            for i, (sent, _) in enumerate(waiters):
+                if args[:len(sent)] == sent:
+                    match = i
+                    break
+
+            _, future = waiters.pop(match)
+            if not waiters:
+                del self._response_queue[address]
+
+        future.get_loop().call_soon_threadsafe(_resolve, future, args)
 
     def _handle_tempo(self, address: str, *args):
         """Handle tempo response."""
@@ -185,9 +213,10 @@ class AbletonClient:
         timeout = timeout or self.config.timeout or 1.0  # Default 1 sec for local OSC
 
         # Create future for response
-        loop = asyncio.get_event_loop()
-        future = loop.create_future()
-        self._response_queue[response_addr] = future
+        future = asyncio.get_running_loop().create_future()
+        waiter = (args, future)
+        with self._queue_lock:
+            self._response_queue.setdefault(response_addr, []).append(waiter)
 
         # Send message
         self._osc_client.send_message(address, list(args) if args else [])
@@ -197,36 +226,15 @@ class AbletonClient:
             result = await asyncio.wait_for(future, timeout)
             return result
         except asyncio.TimeoutError:
-            self._response_queue.pop(response_addr, None)
+            with self._queue_lock:
+                waiters = self._response_queue.get(response_addr)
+                if waiters and waiter in waiters:
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del self._response_queue[response_addr]
             return None
 
     def send(self, address: str, *args):
         """Send message without waiting for response."""
         if self._osc_client:
             self._osc_client.send_message(address, list(args) if args else [])
-
-    # --- Sub-controllers (lazy initialization) ---
-
-    @property
-    def transport(self) -> "TransportController":
-        """Access transport controls (play, stop, tempo, etc.)."""
-        if self._transport is None:
-            from .transport import TransportController
-            self._transport = TransportController(self)
-        return self._transport
-
-    @property
-    def tracks(self) -> "TrackController":
-        """Access track controls (create, volume, pan, etc.)."""
-        if self._tracks is None:
-            from .tracks import TrackController
-            self._tracks = TrackController(self)
-        return self._tracks
-
-    @property
-    def devices(self) -> "DeviceController":
-        """Access device controls (parameters, presets, etc.)."""
-        if self._devices is None:
-            from .devices import DeviceController
-            self._devices = DeviceController(self)
-        return self._devices
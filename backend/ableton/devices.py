@@ -12,7 +12,7 @@ if TYPE_CHECKING:
     from .client import AbletonClient
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceParameter:
     """Represents a device parameter."""
     index: int
@@ -23,7 +23,7 @@ class DeviceParameter:
     is_quantized: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class Device:
     """Represents an Ableton device (instrument or effect)."""
     track_index: int
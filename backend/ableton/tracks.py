@@ -12,7 +12,7 @@ if TYPE_CHECKING:
     from .client import AbletonClient
 
 
-@dataclass
+@dataclass(slots=True)
 class Track:
     """Represents an Ableton track."""
     index: int
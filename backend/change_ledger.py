@@ -5,11 +5,13 @@ Records all changes made to Ableton for undo/redo functionality.
 Like git for your session changes.
 """
 
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Optional
 from enum import Enum
-import uuid
+import os
+import sys
 
 
 class ChangeType(Enum):
@@ -55,7 +57,7 @@ def _pct(value: float) -> int:
     return int(float(value) * 100)
 
 
-@dataclass
+@dataclass(slots=True)
 class Change:
     """A single recorded change."""
     id: str
@@ -83,6 +85,11 @@ class Change:
         }
 
 
+def _describe_device_parameter(target: str, old_value: Any, new_value: Any) -> str:
+    track, device, param = _parse_device_target(target)
+    return f"Set device parameter (track {track}, device {device}, param {param})"
+
+
 # Description generators for each change type
 _DESCRIPTION_GENERATORS = {
     ChangeType.TEMPO: lambda t, o, n: f"Changed tempo from {o} to {n} BPM",
@@ -93,10 +100,7 @@ _DESCRIPTION_GENERATORS = {
     ChangeType.TRACK_ARM: lambda t, o, n: f"{'Armed' if n else 'Disarmed'} track {_parse_track_num(t)}",
     ChangeType.TRACK_CREATE: lambda t, o, n: f"Created track '{n}'",
     ChangeType.TRACK_DELETE: lambda t, o, n: f"Deleted track {_parse_track_num(t)}",
-    ChangeType.DEVICE_PARAMETER: lambda t, o, n: (
-        f"Set device parameter (track {_parse_device_target(t)[0]}, "
-        f"device {_parse_device_target(t)[1]}, param {_parse_device_target(t)[2]})"
-    ),
+    ChangeType.DEVICE_PARAMETER: _describe_device_parameter,
 }
 
 
@@ -125,9 +129,17 @@ class ChangeLedger:
         to_undo = ledger.get_undo_candidates(n=3)
     """
 
-    changes: list[Change] = field(default_factory=list)
+    changes: deque[Change] = field(default_factory=deque)
     max_history: int = 100
 
+    # Random bytes for change IDs, fetched in blocks to save a syscall per change
+    _id_pool: bytes = field(default=b"", init=False, repr=False, compare=False)
+    _id_offset: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Bounded deque: appending past max_history drops the oldest change
+        self.changes = deque(self.changes, maxlen=self.max_history)
+
     def record(
         self,
         change_type: ChangeType,
@@ -137,8 +149,10 @@ class ChangeLedger:
         description: str = ""
     ) -> Change:
         """Record a new change."""
+        # Targets repeat across a session ("transport", "track:0"), so share one copy
+        target = sys.intern(target)
         change = Change(
-            id=str(uuid.uuid4())[:8],
+            id=self._new_id(),
             timestamp=datetime.now(),
             change_type=change_type,
             target=target,
@@ -149,11 +163,45 @@ class ChangeLedger:
 
         self.changes.append(change)
 
-        if len(self.changes) > self.max_history:
-            self.changes = self.changes[-self.max_history:]
-
         return change
 
+    def record_many(self, items: list[tuple]) -> list[Change]:
+        """
+        Record several changes made together.
+
+        Each item is (change_type, target, old_value, new_value) with an optional
+        trailing description. The batch shares one timestamp and one block of
+        random bytes for its IDs.
+        """
+        now = datetime.now()
+        pool = os.urandom(4 * len(items))
+        recorded = []
+        for i, (change_type, target, old_value, new_value, *rest) in enumerate(items):
+            target = sys.intern(target)
+            description = rest[0] if rest else ""
+            recorded.append(Change(
+                id=pool[4 * i:4 * i + 4].hex(),
+                timestamp=now,
+                change_type=change_type,
+                target=target,
+                old_value=old_value,
+                new_value=new_value,
+                description=description or self._auto_description(change_type, target, old_value, new_value),
+            ))
+
+        self.changes.extend(recorded)
+
+        return recorded
+
+    def _new_id(self) -> str:
+        """Generate an 8-hex-char change ID (4 random bytes)."""
+        if self._id_offset + 4 > len(self._id_pool):
+            self._id_pool = os.urandom(256)
+            self._id_offset = 0
+        start = self._id_offset
+        self._id_offset += 4
+        return self._id_pool[start:start + 4].hex()
+
     def _auto_description(
         self,
         change_type: ChangeType,
@@ -212,7 +260,7 @@ class ChangeLedger:
 
     def clear(self):
         """Clear all history."""
-        self.changes = []
+        self.changes.clear()
 
     @property
     def pending_count(self) -> int:
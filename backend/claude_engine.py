@@ -6,6 +6,7 @@ Takes natural language input + session state, returns structured Ableton command
 
 import json
 from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import Optional
 import anthropic
 
@@ -13,25 +14,35 @@ from .config import config
 
 
 # Available actions that can be returned
-AVAILABLE_ACTIONS = {
+_ACTION_SPECS = {
     # Transport
-    "play": {"params": []},
-    "stop": {"params": []},
-    "set_tempo": {"params": ["bpm"]},
-    "toggle_metronome": {"params": []},
+    "play": {"params": ()},
+    "stop": {"params": ()},
+    "set_tempo": {"params": ("bpm",)},
+    "toggle_metronome": {"params": ()},
 
     # Tracks
-    "create_midi_track": {"params": ["name"]},
-    "create_audio_track": {"params": ["name"]},
-    "delete_track": {"params": ["track_index"]},
-    "set_track_volume": {"params": ["track_index", "volume"]},
-    "set_track_pan": {"params": ["track_index", "pan"]},
-    "set_track_mute": {"params": ["track_index", "muted"]},
-    "set_track_solo": {"params": ["track_index", "soloed"]},
-    "set_track_arm": {"params": ["track_index", "armed"]},
+    "create_midi_track": {"params": ("name",)},
+    "create_audio_track": {"params": ("name",)},
+    "delete_track": {"params": ("track_index",)},
+    "set_track_volume": {"params": ("track_index", "volume")},
+    "set_track_pan": {"params": ("track_index", "pan")},
+    "set_track_mute": {"params": ("track_index", "muted")},
+    "set_track_solo": {"params": ("track_index", "soloed")},
+    "set_track_arm": {"params": ("track_index", "armed")},
 
     # Devices
-    "set_device_parameter": {"params": ["track_index", "device_index", "param_index", "value"]},
+    "set_device_parameter": {"params": ("track_index", "device_index", "param_index", "value")},
+}
+
+# Read-only view of the table, per action too
+AVAILABLE_ACTIONS = MappingProxyType({
+    name: MappingProxyType(spec) for name, spec in _ACTION_SPECS.items()
+})
+
+# Required params per action, precomputed for validation
+_REQUIRED_PARAMS = {
+    name: frozenset(info["params"]) for name, info in AVAILABLE_ACTIONS.items()
 }
 
 
@@ -124,7 +135,7 @@ Response:
 """
 
 
-@dataclass
+@dataclass(slots=True)
 class ClaudeResponse:
     """Structured response from Claude."""
     thinking: str = ""
@@ -209,14 +220,13 @@ class ClaudeEngine:
             # Claude might wrap it in markdown code blocks
             json_text = text
 
-            if "```json" in text:
-                start = text.find("```json") + 7
+            fence = text.find("```")
+            if fence >= 0:
+                start = fence + 3
+                if text.startswith("json", start):
+                    start += 4
                 end = text.find("```", start)
-                json_text = text[start:end].strip()
-            elif "```" in text:
-                start = text.find("```") + 3
-                end = text.find("```", start)
-                json_text = text[start:end].strip()
+                json_text = text[start:end if end >= 0 else len(text)].strip()
 
             data = json.loads(json_text)
 
@@ -248,15 +258,14 @@ class ClaudeEngine:
             action = cmd.get("action")
             params = cmd.get("params", {})
 
-            if action not in AVAILABLE_ACTIONS:
+            required = _REQUIRED_PARAMS.get(action)
+            if required is None:
                 errors.append(f"Unknown action: {action}")
                 continue
 
             # Check required params
-            action_info = AVAILABLE_ACTIONS[action]
-            missing = [p for p in action_info["params"] if p not in params]
-
-            if missing:
+            if not required.issubset(params):
+                missing = [p for p in AVAILABLE_ACTIONS[action]["params"] if p not in params]
                 errors.append(f"Action '{action}' missing params: {missing}")
                 continue
 
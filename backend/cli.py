@@ -16,6 +16,9 @@ from .executor import CommandExecutor
 from .session_cache import SessionCache
 from .change_ledger import ChangeLedger
 
+# "undo 3" - undo the last N changes
+_UNDO_N_RE = re.compile(r"undo\s+(\d+)")
+
 
 async def main():
     """Main CLI loop."""
@@ -122,7 +125,7 @@ async def main():
                 continue
 
             # Undo N command
-            undo_match = re.match(r"undo\s+(\d+)", user_input.lower())
+            undo_match = _UNDO_N_RE.match(user_input.lower())
             if undo_match:
                 count = int(undo_match.group(1))
                 if ledger.pending_count == 0:
@@ -5,24 +5,43 @@ Queries and caches the current state of the Ableton session so Claude
 can understand track names, devices, and other context.
 """
 
-from dataclasses import dataclass, field, asdict
+import asyncio
+import sys
+from dataclasses import dataclass, field, replace
 from typing import Optional
 
 from .ableton import AbletonClient
 
+# Most find_* results remembered between refreshes; the oldest go first
+LOOKUP_CACHE_SIZE = 256
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class CachedDevice:
-    """Cached device information."""
+    """Cached device information (immutable, so hashable)."""
     index: int
     name: str
     class_name: str = ""
     type: str = ""
+    # Lowercased name for case-insensitive search, derived once
+    name_lower: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "name_lower", sys.intern(self.name.lower()))
 
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "index": self.index,
+            "name": self.name,
+            "class_name": self.class_name,
+            "type": self.type,
+        }
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class CachedTrack:
-    """Cached track information."""
+    """Cached track information (immutable, so hashable)."""
     index: int
     name: str
     type: str = "midi"  # midi, audio, return, master
@@ -31,17 +50,40 @@ class CachedTrack:
     muted: bool = False
     soloed: bool = False
     armed: bool = False
-    devices: list[CachedDevice] = field(default_factory=list)
+    devices: tuple[CachedDevice, ...] = ()
+    # Lowercased name for case-insensitive search, derived once
+    name_lower: str = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self):
+        object.__setattr__(self, "devices", tuple(self.devices))
+        object.__setattr__(self, "name_lower", sys.intern(self.name.lower()))
 
-@dataclass
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "index": self.index,
+            "name": self.name,
+            "type": self.type,
+            "volume": round(self.volume, 2),
+            "pan": round(self.pan, 2),
+            "muted": self.muted,
+            "soloed": self.soloed,
+            "armed": self.armed,
+            "devices": [d.to_dict() for d in self.devices],
+        }
+
+
+@dataclass(frozen=True, slots=True)
 class SessionState:
-    """Complete cached session state."""
+    """Complete cached session state; refreshing replaces it rather than editing it."""
     tempo: float = 120.0
     playing: bool = False
     recording: bool = False
     metronome: bool = False
-    tracks: list[CachedTrack] = field(default_factory=list)
+    tracks: tuple[CachedTrack, ...] = ()
+
+    def __post_init__(self):
+        object.__setattr__(self, "tracks", tuple(self.tracks))
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
@@ -50,28 +92,7 @@ class SessionState:
             "playing": self.playing,
             "recording": self.recording,
             "metronome": self.metronome,
-            "tracks": [
-                {
-                    "index": t.index,
-                    "name": t.name,
-                    "type": t.type,
-                    "volume": round(t.volume, 2),
-                    "pan": round(t.pan, 2),
-                    "muted": t.muted,
-                    "soloed": t.soloed,
-                    "armed": t.armed,
-                    "devices": [
-                        {
-                            "index": d.index,
-                            "name": d.name,
-                            "class_name": d.class_name,
-                            "type": d.type,
-                        }
-                        for d in t.devices
-                    ]
-                }
-                for t in self.tracks
-            ]
+            "tracks": [t.to_dict() for t in self.tracks],
         }
 
 
@@ -102,6 +123,19 @@ class SessionCache:
         self._client = client
         self._state = SessionState()
 
+        # Lowercased-name indexes for the find_* helpers, rebuilt lazily
+        # whenever the tracks tuple they were built from is replaced
+        self._indexed_tracks: Optional[tuple[CachedTrack, ...]] = None
+        self._track_by_name: dict[str, CachedTrack] = {}
+        self._device_by_name: dict[str, tuple[CachedTrack, CachedDevice]] = {}
+        self._device_by_class: dict[str, tuple[CachedTrack, CachedDevice]] = {}
+        # Flat columns for the partial-match scans, in track/device order
+        self._track_names: list[str] = []
+        self._device_rows: list[tuple[str, str, CachedTrack, CachedDevice]] = []
+        # Results of find_* calls (including misses), dropped with the indexes
+        # and capped at LOOKUP_CACHE_SIZE
+        self._lookups: dict[tuple, object] = {}
+
     @property
     def state(self) -> SessionState:
         """Get current cached state."""
@@ -118,25 +152,40 @@ class SessionCache:
             Updated SessionState
         """
         try:
-            # Transport state
-            self._state.tempo = await self._client.transport.get_tempo() or 120.0
-            self._state.playing = await self._client.transport.is_playing() or False
-            self._state.recording = await self._client.transport.is_recording() or False
-            self._state.metronome = await self._client.transport.get_metronome() or False
-
-            # Tracks
-            self._state.tracks = []
-            track_count = await self._client.tracks.get_count() or 0
-
-            for i in range(track_count):
-                try:
-                    print(f"  Loading track {i + 1}/{track_count}...", end="\r")
-                    track = await self._get_track_info(i, include_devices)
-                    if track:
-                        self._state.tracks.append(track)
-                except Exception as e:
+            # Transport state and track count, fetched together
+            transport = self._client.transport
+            tempo, playing, recording, metronome, track_count = await asyncio.gather(
+                transport.get_tempo(),
+                transport.is_playing(),
+                transport.is_recording(),
+                transport.get_metronome(),
+                self._client.tracks.get_count(),
+            )
+
+            # Tracks, fetched concurrently
+            track_count = track_count or 0
+            print(f"  Loading {track_count} tracks...", end="\r")
+
+            results = await asyncio.gather(
+                *(self._get_track_info(i, include_devices) for i in range(track_count)),
+                return_exceptions=True,
+            )
+
+            tracks = []
+            for i, result in enumerate(results):
+                if isinstance(result, BaseException):
                     # Skip problematic tracks but continue
-                    print(f"  [Warning] Could not load track {i}: {e}")
+                    print(f"  [Warning] Could not load track {i}: {result}")
+                elif result:
+                    tracks.append(result)
+
+            self._state = SessionState(
+                tempo=tempo or 120.0,
+                playing=playing or False,
+                recording=recording or False,
+                metronome=metronome or False,
+                tracks=tuple(tracks),
+            )
 
             # Clear the progress line
             print(" " * 40, end="\r")
@@ -160,56 +209,100 @@ class SessionCache:
         track = await self._get_track_info(track_index, include_devices)
 
         if track:
-            # Update in list
-            for i, t in enumerate(self._state.tracks):
+            tracks = list(self._state.tracks)
+            for i, t in enumerate(tracks):
                 if t.index == track_index:
-                    self._state.tracks[i] = track
-                    return track
-
-            # Not found, append
-            self._state.tracks.append(track)
+                    tracks[i] = track
+                    break
+            else:
+                # Not found, append
+                tracks.append(track)
+            self._state = replace(self._state, tracks=tuple(tracks))
 
         return track
 
     async def _get_track_info(self, track_index: int, include_devices: bool) -> Optional[CachedTrack]:
         """Get full track information."""
-        name = await self._client.tracks.get_name(track_index)
+        tracks = self._client.tracks
+        name, volume, pan, muted, soloed, armed = await asyncio.gather(
+            tracks.get_name(track_index),
+            tracks.get_volume(track_index),
+            tracks.get_pan(track_index),
+            tracks.get_mute(track_index),
+            tracks.get_solo(track_index),
+            tracks.get_arm(track_index),
+        )
         if name is None:
             return None
 
-        track = CachedTrack(
+        devices = await self._get_track_devices(track_index) if include_devices else ()
+
+        return CachedTrack(
             index=track_index,
             name=name,
             type="midi",  # TODO: detect type from Ableton
-            volume=await self._client.tracks.get_volume(track_index) or 0.85,
-            pan=await self._client.tracks.get_pan(track_index) or 0.0,
-            muted=await self._client.tracks.get_mute(track_index) or False,
-            soloed=await self._client.tracks.get_solo(track_index) or False,
-            armed=await self._client.tracks.get_arm(track_index) or False,
+            volume=volume or 0.85,
+            pan=pan or 0.0,
+            muted=muted or False,
+            soloed=soloed or False,
+            armed=armed or False,
+            devices=devices,
         )
 
-        if include_devices:
-            track.devices = await self._get_track_devices(track_index)
-
-        return track
-
-    async def _get_track_devices(self, track_index: int) -> list[CachedDevice]:
+    async def _get_track_devices(self, track_index: int) -> tuple[CachedDevice, ...]:
         """Get all devices on a track."""
-        devices = []
         device_count = await self._client.devices.get_count(track_index) or 0
 
-        for i in range(device_count):
-            name = await self._client.devices.get_name(track_index, i)
-            if name:
-                device = CachedDevice(
-                    index=i,
-                    name=name,
-                    class_name=await self._client.devices.get_class_name(track_index, i) or "",
-                    type=await self._client.devices.get_type(track_index, i) or "",
-                )
-                devices.append(device)
+        devices = await asyncio.gather(
+            *(self._get_device_info(track_index, i) for i in range(device_count))
+        )
+        return tuple(device for device in devices if device is not None)
+
+    async def _get_device_info(self, track_index: int, device_index: int) -> Optional[CachedDevice]:
+        """Get one device's name, class name and type."""
+        devices = self._client.devices
+        name, class_name, device_type = await asyncio.gather(
+            devices.get_name(track_index, device_index),
+            devices.get_class_name(track_index, device_index),
+            devices.get_type(track_index, device_index),
+        )
+        if not name:
+            return None
 
-        return devices
+        return CachedDevice(
+            index=device_index,
+            name=name,
+            class_name=class_name or "",
+            type=device_type or "",
+        )
+
+    def _ensure_indexes(self):
+        """Rebuild the name indexes if the track list has changed since the last build."""
+        tracks = self._state.tracks
+        if tracks is self._indexed_tracks:
+            return
+
+        track_by_name = {}
+        device_by_name = {}
+        device_by_class = {}
+        device_rows = []
+        for track in tracks:
+            # setdefault keeps the first match, like the linear scans did
+            track_by_name.setdefault(track.name_lower, track)
+            for device in track.devices:
+                class_lower = device.class_name.lower()
+                device_by_name.setdefault(device.name_lower, (track, device))
+                if class_lower:
+                    device_by_class.setdefault(class_lower, (track, device))
+                device_rows.append((device.name_lower, class_lower, track, device))
+
+        self._track_by_name = track_by_name
+        self._device_by_name = device_by_name
+        self._device_by_class = device_by_class
+        self._track_names = [track.name_lower for track in tracks]
+        self._device_rows = device_rows
+        self._lookups = {}
+        self._indexed_tracks = tracks
 
     def find_track_by_name(self, name: str) -> Optional[CachedTrack]:
         """
@@ -221,24 +314,35 @@ class SessionCache:
         Returns:
             Matching CachedTrack or None
         """
+        self._ensure_indexes()
         name_lower = name.lower()
 
         # Exact match first
-        for track in self._state.tracks:
-            if track.name.lower() == name_lower:
-                return track
+        track = self._track_by_name.get(name_lower)
+        if track is not None:
+            return track
+
+        key = ("track", name_lower)
+        if key in self._lookups:
+            return self._lookups[key]
 
         # Partial match
-        for track in self._state.tracks:
-            if name_lower in track.name.lower():
-                return track
+        found = next(
+            (track for track, lower in zip(self._state.tracks, self._track_names) if name_lower in lower),
+            None,
+        )
 
-        return None
+        self._remember(key, found)
+        return found
 
     def find_device_by_name(self, device_name: str, track_name: str = None) -> Optional[tuple[CachedTrack, CachedDevice]]:
         """
         Find a device by name, optionally within a specific track.
 
+        An exact (case-insensitive) name match wins, then an exact class name
+        match; otherwise the first device whose name or class name contains
+        the query.
+
         Args:
             device_name: Device name to search for
             track_name: Optional track name to limit search
@@ -246,19 +350,46 @@ class SessionCache:
         Returns:
             Tuple of (track, device) or None
         """
+        self._ensure_indexes()
         device_lower = device_name.lower()
-        tracks_to_search = self._state.tracks
-
+        key = ("device", device_lower, track_name.lower() if track_name else None)
+        if key in self._lookups:
+            return self._lookups[key]
+
+        found = self._search_device(device_lower, track_name)
+        self._remember(key, found)
+        return found
+
+    def _remember(self, key: tuple, found: object):
+        """Memoize a find_* result, dropping the oldest once the cache is full."""
+        if len(self._lookups) >= LOOKUP_CACHE_SIZE:
+            del self._lookups[next(iter(self._lookups))]
+        self._lookups[key] = found
+
+    def _search_device(self, device_lower: str, track_name: Optional[str]) -> Optional[tuple[CachedTrack, CachedDevice]]:
+        """Uncached device search behind find_device_by_name."""
         if track_name:
             track = self.find_track_by_name(track_name)
-            if track:
-                tracks_to_search = [track]
-            else:
+            if track is None:
                 return None
-
-        for track in tracks_to_search:
+            # The global indexes keep only each name's first track, so scan this one
+            for device in track.devices:
+                if device.name_lower == device_lower:
+                    return (track, device)
             for device in track.devices:
-                if device_lower in device.name.lower() or device_lower in device.class_name.lower():
+                if device.class_name.lower() == device_lower:
                     return (track, device)
+            for device in track.devices:
+                if device_lower in device.name_lower or device_lower in device.class_name.lower():
+                    return (track, device)
+            return None
 
-        return None
+        found = self._device_by_name.get(device_lower) or self._device_by_class.get(device_lower)
+        if found is not None:
+            return found
+
+        return next(
+            ((track, device) for name, class_name, track, device in self._device_rows
+             if device_lower in name or device_lower in class_name),
+            None,
+        )
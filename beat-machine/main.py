@@ -2,10 +2,13 @@ import json
 import uuid
 import os
 import asyncio
+import atexit
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
@@ -13,7 +16,7 @@ from pydantic import BaseModel
 from dotenv import load_dotenv
 
 from midi_engine import MIDIEngine
-from pattern_generator import PatternGenerator
+from pattern_generator import PATTERN_CONTEXT_MARKER, PatternGenerator
 
 load_dotenv()
 
@@ -26,25 +29,60 @@ generator: Optional[PatternGenerator] = None
 active_session_id: Optional[str] = None
 connected_websockets: list[WebSocket] = []
 loop: Optional[asyncio.AbstractEventLoop] = None
+flush_task: Optional[asyncio.Task] = None  # Held so the loop's weak reference isn't the only one
 
 SESSIONS_FILE = Path("sessions.json")
+SAVE_INTERVAL = 5.0  # Seconds — bursts of changes are written at most this often
+sessions_dirty = False
+last_save = 0.0
+MAX_HISTORY_MESSAGES = 20  # Most recent messages (10 exchanges) sent to Claude
 
 
 # --- Persistence ---
 def save_sessions():
+    """Write all sessions to disk atomically (temp file + rename)."""
+    global sessions_dirty, last_save
     try:
-        with open(SESSIONS_FILE, "w") as f:
-            json.dump(sessions, f, indent=2, default=str)
+        tmp_file = SESSIONS_FILE.with_name(SESSIONS_FILE.name + ".tmp")
+        with open(tmp_file, "wb") as f:
+            f.write(orjson.dumps(sessions, option=orjson.OPT_INDENT_2, default=str))
+        os.replace(tmp_file, SESSIONS_FILE)
+        sessions_dirty = False
+        last_save = time.monotonic()
     except Exception as e:
         print(f"Warning: Could not save sessions: {e}")
 
 
+def mark_sessions_dirty():
+    """Record that sessions changed; saves now unless we saved very recently."""
+    global sessions_dirty
+    sessions_dirty = True
+    if time.monotonic() - last_save >= SAVE_INTERVAL:
+        save_sessions()
+
+
+def flush_sessions():
+    """Save any changes still waiting on the save interval."""
+    if sessions_dirty:
+        save_sessions()
+
+
+async def flush_sessions_periodically():
+    """Flush pending session changes every SAVE_INTERVAL until cancelled."""
+    while True:
+        await asyncio.sleep(SAVE_INTERVAL)
+        flush_sessions()
+
+
+atexit.register(flush_sessions)
+
+
 def load_sessions():
     global sessions
     if SESSIONS_FILE.exists():
         try:
-            with open(SESSIONS_FILE, "r") as f:
-                sessions = json.load(f)
+            with open(SESSIONS_FILE, "rb") as f:
+                sessions = orjson.loads(f.read())
             print(f"📂 Loaded {len(sessions)} sessions")
         except Exception as e:
             print(f"Warning: Could not load sessions: {e}")
@@ -93,10 +131,11 @@ def on_step(step: int):
 # --- Lifecycle ---
 @app.on_event("startup")
 async def startup():
-    global engine, generator, loop
+    global engine, generator, loop, flush_task
     loop = asyncio.get_event_loop()
 
     load_sessions()
+    flush_task = asyncio.create_task(flush_sessions_periodically())
 
     # Initialize MIDI engine (connects to first available device)
     available_devices = MIDIEngine.list_devices()
@@ -130,9 +169,11 @@ async def startup():
 
 @app.on_event("shutdown")
 async def shutdown():
+    if flush_task:
+        flush_task.cancel()
     if engine:
         engine.close()
-    save_sessions()
+    flush_sessions()
     print("👋 Shut down cleanly")
 
 
@@ -186,7 +227,7 @@ async def create_session(req: SessionCreate):
         "created_at": datetime.now().isoformat(),
     }
     sessions[session_id] = session
-    save_sessions()
+    mark_sessions_dirty()
     await broadcast({"type": "session_created", "session": session})
     return session
 
@@ -222,7 +263,7 @@ async def delete_session(session_id: str):
             active_session_id = None
             if engine:
                 engine.stop()
-        save_sessions()
+        mark_sessions_dirty()
         await broadcast({"type": "session_deleted", "session_id": session_id})
     return {"ok": True}
 
@@ -240,9 +281,13 @@ async def send_message(session_id: str, req: MessageRequest):
     session = sessions[session_id]
     active_session_id = session_id
 
-    # Build Claude conversation from history
+    # Build Claude conversation from recent history. Older turns are dropped —
+    # the playing pattern is re-sent below, so it never depends on them.
+    history = session["conversation"][-MAX_HISTORY_MESSAGES:]
+    if history and history[0]["role"] != "user":
+        history = history[1:]
     claude_messages = []
-    for msg in session["conversation"]:
+    for msg in history:
         claude_messages.append({"role": msg["role"], "content": msg["content"]})
 
     # New user message - inject current pattern context if we have one
@@ -250,7 +295,7 @@ async def send_message(session_id: str, req: MessageRequest):
     if session["patterns"] and session["current_version"] >= 0:
         current_pattern = session["patterns"][session["current_version"]]
         user_content += (
-            f"\n\n[CONTEXT — the current playing pattern is:\n"
+            f"\n\n{PATTERN_CONTEXT_MARKER}\n"
             f"```json\n{json.dumps(current_pattern, indent=2)}\n```\n"
             f"Modify this pattern based on my request above. Keep everything I didn't mention.]"
         )
@@ -260,9 +305,17 @@ async def send_message(session_id: str, req: MessageRequest):
     # Broadcast that we're generating
     await broadcast({"type": "generating", "session_id": session_id})
 
-    # Generate pattern
+    def on_text(text: str):
+        """Called from the generation thread as the reply streams in."""
+        asyncio.run_coroutine_threadsafe(
+            broadcast({"type": "generating_text", "session_id": session_id, "text": text}), loop
+        )
+
+    # Generate pattern (in a worker thread so the event loop keeps serving steps)
     try:
-        message, pattern = generator.generate(claude_messages)
+        message, pattern = await loop.run_in_executor(
+            None, generator.generate, claude_messages, on_text
+        )
     except Exception as e:
         return {"error": f"Generation failed: {str(e)}"}
 
@@ -281,7 +334,7 @@ async def send_message(session_id: str, req: MessageRequest):
             if not engine.playing:
                 engine.play()
 
-    save_sessions()
+    mark_sessions_dirty()
 
     result = {
         "message": message,
@@ -333,7 +386,7 @@ async def set_version(session_id: str, version: int):
         pattern = session["patterns"][version]
         if engine:
             engine.set_pattern(pattern)
-        save_sessions()
+        mark_sessions_dirty()
 
         await broadcast({
             "type": "version_change",
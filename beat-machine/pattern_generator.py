@@ -1,6 +1,11 @@
-import json
-import re
+import copy
+import hashlib
 import os
+import re
+from collections import OrderedDict
+from typing import Callable
+
+import orjson
 from anthropic import Anthropic
 
 SYSTEM_PROMPT = """You are a drum pattern programmer and creative collaborator for a Roland TR-8S drum machine. You're a skilled session drummer and producer who understands groove, genre conventions, and what makes a beat feel good.
@@ -80,77 +85,223 @@ This is just a display recommendation — the user controls the actual kit on th
 
 Keep it musical. Keep it fun. You're jamming."""
 
+# The system prompt never changes, so mark it for prompt caching — turns after
+# the first reuse the cached prefix instead of reprocessing it. On its own it is
+# near the minimum cacheable length, so the conversation history gets a
+# breakpoint too (see _with_history_breakpoint).
+CACHE_CONTROL = {"type": "ephemeral"}
+SYSTEM_BLOCKS = [
+    {"type": "text", "text": SYSTEM_PROMPT, "cache_control": CACHE_CONTROL},
+]
+
+# main.py appends the playing pattern to the user's message after this marker
+PATTERN_CONTEXT_MARKER = "[CONTEXT — the current playing pattern is:"
+
+# Short tweaks to a playing pattern ("make it busier", "add a clap") don't
+# need the big model; they go to the faster one.
+SIMPLE_EDIT_WORDS = frozenset({
+    "busier", "simpler", "sparser", "add", "remove", "drop", "swap",
+    "louder", "quieter", "faster", "slower", "more", "less", "mute",
+})
+SIMPLE_EDIT_MAX_WORDS = 15
+
+# A full 11-instrument, 64-step pattern is ~1,500 tokens. Edits get a tighter
+# cap with plenty of headroom; new patterns keep the larger budget.
+MAX_TOKENS = 8192
+EDIT_MAX_TOKENS = 4096
+
+# Identical conversations (e.g. re-sending a request after reverting) are
+# answered from memory instead of another API call.
+RESPONSE_CACHE_SIZE = 128
+
+
+def _is_simple_edit(conversation: list[dict]) -> bool:
+    """True if the last user message is a short tweak to the playing pattern."""
+    if not conversation or conversation[-1].get("role") != "user":
+        return False
+    content = conversation[-1].get("content")
+    if not isinstance(content, str) or PATTERN_CONTEXT_MARKER not in content:
+        return False
+    request = content.split(PATTERN_CONTEXT_MARKER, 1)[0]
+    words = re.findall(r"[a-z']+", request.lower())
+    return len(words) < SIMPLE_EDIT_MAX_WORDS and not SIMPLE_EDIT_WORDS.isdisjoint(words)
+
+
+def _with_history_breakpoint(conversation: list[dict]) -> list[dict]:
+    """
+    Copy of the conversation with a cache breakpoint on the last message before
+    the new user turn, so the next turn reads the earlier history from the cache.
+    """
+    if len(conversation) < 2 or not conversation[-2].get("content"):
+        return conversation
+    last = conversation[-2]
+    content = last["content"]
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content, "cache_control": CACHE_CONTROL}]
+    else:
+        blocks = [*content[:-1], {**content[-1], "cache_control": CACHE_CONTROL}]
+    return [*conversation[:-2], {**last, "content": blocks}, conversation[-1]]
+
+
+def _match_brace(text: str, start: int) -> int:
+    """Return the index of the brace closing the object opened at text[start], or -1."""
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def _find_json_block(text: str) -> tuple[int, int, int, int] | None:
+    """
+    Find the pattern JSON in Claude's response with a single forward scan.
+    Prefers a ```json fenced block, falling back to the first raw object
+    that mentions "instruments".
+    Returns (start, end) of the object plus (cut_start, cut_end), the span to
+    drop from the conversational message: the whole fence, or nothing for a
+    raw object.
+    """
+    fence = text.find("```json")
+    if fence >= 0:
+        start = fence + 7
+        while start < len(text) and text[start].isspace():
+            start += 1
+        if text.startswith("{", start):
+            end = _match_brace(text, start)
+            if end >= 0:
+                close = end + 1
+                while close < len(text) and text[close].isspace():
+                    close += 1
+                if text.startswith("```", close):
+                    return start, end + 1, fence, close + 3
+
+    # Fallback: raw JSON with instruments key
+    start = text.find("{")
+    if start >= 0:
+        end = _match_brace(text, start)
+        if end >= 0 and '"instruments"' in text[start:end]:
+            return start, end + 1, start, start
+
+    return None
+
 
 class PatternGenerator:
-    def __init__(self):
+    def __init__(
+        self,
+        model: str = "claude-sonnet-4-20250514",
+        fast_model: str = "claude-haiku-4-5",
+    ):
         api_key = os.getenv("ANTHROPIC_API_KEY")
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY not set")
         self.client = Anthropic(api_key=api_key)
+        self.model = model
+        self.fast_model = fast_model
+        self._response_cache: OrderedDict[str, tuple[str, dict]] = OrderedDict()
+        self.last_usage = None  # Token usage of the last API call, incl. cache reads
 
-    def generate(self, conversation: list[dict]) -> tuple[str, dict | None]:
+    def generate(
+        self,
+        conversation: list[dict],
+        on_text: Callable[[str], None] | None = None,
+        max_tokens: int | None = None,
+    ) -> tuple[str, dict | None]:
         """
         Generate or refine a pattern based on conversation history.
+        Streams the response; on_text (if given) is called with each text
+        delta as it arrives, so callers can show the reply before it finishes.
+        max_tokens overrides the default budget (smaller for simple edits).
         Returns (assistant_message, pattern_dict or None)
         """
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=8192,  # 64-step patterns need more tokens
-            system=SYSTEM_PROMPT,
-            messages=conversation,
-        )
+        key = self._cache_key(conversation)
+        cached = self._response_cache.pop(key, None)
+        if cached is not None:
+            self._response_cache[key] = cached  # Most recently used
+            message, pattern = cached
+            return message, copy.deepcopy(pattern)
+
+        if _is_simple_edit(conversation):
+            model, default_max_tokens = self.fast_model, EDIT_MAX_TOKENS
+        else:
+            model, default_max_tokens = self.model, MAX_TOKENS
 
-        full_text = response.content[0].text
+        chunks = []
+        with self.client.messages.stream(
+            model=model,
+            max_tokens=max_tokens or default_max_tokens,
+            system=SYSTEM_BLOCKS,
+            messages=_with_history_breakpoint(conversation),
+        ) as stream:
+            for text in stream.text_stream:
+                chunks.append(text)
+                if on_text:
+                    on_text(text)
+            self.last_usage = stream.get_final_message().usage
 
-        # Extract JSON pattern from response
-        pattern = self._extract_pattern(full_text)
+        full_text = "".join(chunks)
 
-        # Extract conversational message (everything outside the JSON block)
-        message = re.sub(r"```json\s*\{[\s\S]*?\}\s*```", "", full_text).strip()
-        # Clean up any leftover backticks
-        message = re.sub(r"```\s*```", "", message).strip()
+        # Split into the JSON pattern and the conversational message around it
+        found = _find_json_block(full_text)
+        if found:
+            start, end, cut_start, cut_end = found
+            pattern = self._parse_pattern(full_text[start:end])
+            message = (full_text[:cut_start] + full_text[cut_end:]).strip()
+        else:
+            pattern = None
+            message = full_text.strip()
+
+        # Only cache usable answers so a retry after a bad response hits the API
+        if pattern is not None:
+            self._response_cache[key] = (message, copy.deepcopy(pattern))
+            if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
 
         return message, pattern
 
-    def _extract_pattern(self, text: str) -> dict | None:
-        """Extract JSON pattern from Claude's response."""
-        # Look for ```json ... ``` blocks
-        match = re.search(r"```json\s*(\{[\s\S]*?\})\s*```", text)
-        if match:
-            try:
-                pattern = json.loads(match.group(1))
-                return self._validate_pattern(pattern)
-            except json.JSONDecodeError:
-                pass
-
-        # Fallback: look for raw JSON with instruments key
-        match = re.search(r'(\{[\s\S]*"instruments"[\s\S]*\})', text)
-        if match:
-            try:
-                pattern = json.loads(match.group(1))
-                return self._validate_pattern(pattern)
-            except json.JSONDecodeError:
-                pass
-
-        return None
+    def _cache_key(self, conversation: list[dict]) -> str:
+        """Fingerprint a conversation for the response cache."""
+        data = orjson.dumps(conversation, option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def _parse_pattern(self, block: str) -> dict | None:
+        """Parse and validate the JSON pattern block from Claude's response."""
+        try:
+            pattern = orjson.loads(block)
+        except orjson.JSONDecodeError:
+            return None
+        return self._validate_pattern(pattern)
 
     def _validate_pattern(self, pattern: dict) -> dict:
         """Ensure pattern has required fields and valid data."""
         if "bpm" not in pattern:
             pattern["bpm"] = 120
-        if "swing" not in pattern:
-            pattern["swing"] = 0
+        # Swing is 0-100, as MIDIEngine.set_swing clamps it
+        pattern["swing"] = max(0, min(100, pattern.get("swing", 0)))
         if "instruments" not in pattern:
             pattern["instruments"] = {}
 
-        # Ensure all step arrays are length 64 (4 bars)
-        for inst_name, inst_data in pattern["instruments"].items():
-            steps = inst_data.get("steps", [])
+        # Ensure all step arrays are length 64 (4 bars) with clamped velocities.
+        # Clamp only the steps we keep, then pad with zeros (already in range).
+        for inst_data in pattern["instruments"].values():
+            steps = [max(0, min(127, int(v))) for v in inst_data.get("steps", [])[:64]]
             if len(steps) < 64:
-                steps.extend([0] * (64 - len(steps)))
-            elif len(steps) > 64:
-                steps = steps[:64]
-            # Clamp velocities
-            inst_data["steps"] = [max(0, min(127, int(v))) for v in steps]
+                steps += [0] * (64 - len(steps))
+            inst_data["steps"] = steps
 
         return pattern
\ No newline at end of file
@@ -10,6 +10,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 
+def pytest_configure(config):
+    config.addinivalue_line("markers", "unit: fast isolated tests, no Ableton needed")
+
+
 @pytest.fixture
 def ableton_config():
     """Provide test Ableton configuration."""
@@ -0,0 +1,144 @@
+"""
+Lightweight stand-ins for the Ableton client.
+
+AsyncCallLog replaces AsyncMock for controller methods: it records calls,
+returns a fixed value (or raises / delegates to a side effect), and costs a
+few slots to build instead of a full mock. make_client() builds one stub per async method
+of the real controllers and checks call arguments against their signatures,
+so a stub can't drift from the API it stands in for.
+"""
+
+import copy
+import inspect
+from functools import cache
+from types import SimpleNamespace
+
+from backend.ableton import DeviceController, TrackController, TransportController
+
+
+class AsyncCallLog:
+    """Awaitable stub for an async client method that records its calls."""
+
+    __slots__ = ("calls", "return_value", "side_effect", "signature")
+
+    def __init__(self, return_value=None, signature: inspect.Signature | None = None):
+        self.calls: list[tuple[tuple, dict]] = []
+        self.return_value = return_value
+        self.side_effect = None  # exception to raise, or callable producing the result
+        self.signature = signature
+
+    async def __call__(self, *args, **kwargs):
+        if self.signature is not None:
+            self.signature.bind(*args, **kwargs)  # TypeError on a bad call, like autospec
+        self.calls.append((args, kwargs))
+        if self.side_effect is None:
+            return self.return_value
+        if isinstance(self.side_effect, BaseException):
+            raise self.side_effect
+        return self.side_effect(*args, **kwargs)
+
+    def __copy__(self):
+        """Copy the configuration, with a call log of its own."""
+        clone = AsyncCallLog(self.return_value, self.signature)
+        clone.side_effect = self.side_effect
+        return clone
+
+    def reset(self):
+        """Forget recorded calls and side effect; keep the return value."""
+        self.calls.clear()
+        self.side_effect = None
+
+
+# Values returned by the getters the executor reads; other methods return None
+_RETURN_VALUES = {
+    TransportController: {"get_tempo": 120.0},
+    TrackController: {
+        "create_midi": 0,
+        "create_audio": 1,
+        "get_volume": 0.85,
+        "get_pan": 0.0,
+        "get_mute": False,
+        "get_solo": False,
+        "get_arm": False,
+    },
+    DeviceController: {"get_parameter": 0.5},
+}
+
+
+@cache
+def _async_methods(controller_cls: type) -> dict[str, inspect.Signature]:
+    """Public async methods of a controller, with `self` dropped from each signature."""
+    methods = {}
+    for name, func in inspect.getmembers(controller_cls, inspect.iscoroutinefunction):
+        if name.startswith("_"):
+            continue
+        sig = inspect.signature(func)
+        methods[name] = sig.replace(parameters=list(sig.parameters.values())[1:])
+    return methods
+
+
+def _stub_controller(controller_cls: type) -> SimpleNamespace:
+    methods = _async_methods(controller_cls)
+    return_values = _RETURN_VALUES[controller_cls]
+    unknown = return_values.keys() - methods.keys()
+    assert not unknown, f"{controller_cls.__name__} has no async method(s) {sorted(unknown)}"
+    return SimpleNamespace(**{
+        name: AsyncCallLog(return_values.get(name), sig) for name, sig in methods.items()
+    })
+
+
+def make_client() -> SimpleNamespace:
+    """Build a stub client with transport, tracks and devices controllers."""
+    return SimpleNamespace(
+        transport=_stub_controller(TransportController),
+        tracks=_stub_controller(TrackController),
+        devices=_stub_controller(DeviceController),
+    )
+
+
+class _ClientCopy:
+    """Copy of a stub client; each controller is copied on first access."""
+
+    def __init__(self, template: SimpleNamespace):
+        self._template = template
+
+    def __getattr__(self, name: str) -> SimpleNamespace:
+        # Only reached on a miss, so each controller is copied at most once
+        if name.startswith("_"):
+            raise AttributeError(name)
+        controller = SimpleNamespace(**{
+            method: copy.copy(stub) for method, stub in vars(getattr(self._template, name)).items()
+        })
+        setattr(self, name, controller)
+        return controller
+
+
+def copy_client(client: SimpleNamespace) -> _ClientCopy:
+    """
+    Independent copy of a configured stub client (fresh call logs, same values).
+
+    Controllers are copied lazily, so a test that never reaches client.devices
+    doesn't pay for copying it.
+    """
+    return _ClientCopy(client)
+
+
+def reset_client(client: SimpleNamespace):
+    """Reset every stub method on a client built by make_client()."""
+    for controller in (client.transport, client.tracks, client.devices):
+        for stub in vars(controller).values():
+            stub.reset()
+
+
+def assert_called_once(stub: AsyncCallLog):
+    assert len(stub.calls) == 1, f"expected 1 call, got {len(stub.calls)}"
+
+
+def assert_called_once_with(stub: AsyncCallLog, *args, **kwargs):
+    assert stub.calls == [(args, kwargs)], f"expected one call with {(args, kwargs)}, got {stub.calls}"
+
+
+def assert_called_with(stub: AsyncCallLog, *args, **kwargs):
+    """Assert the most recent call used these arguments."""
+    assert stub.calls, "expected a call, got none"
+    assert stub.calls[-1] == (args, kwargs), f"last called with {stub.calls[-1]}"
@@ -0,0 +1,71 @@
+"""
+Unit test configuration.
+
+Unit tests never open an OSC connection, so when python-osc is not
+installed it is replaced with lightweight stubs before backend.ableton is
+imported. This lets the unit suite run without python-osc; when the real
+package is available it is used as-is.
+"""
+
+import importlib.util
+import sys
+import types
+
+
+class _SimpleUDPClient:
+    """Stub for pythonosc.udp_client.SimpleUDPClient."""
+
+    def __init__(self, address, port, *args, **kwargs):
+        self.sent = []
+
+    def send_message(self, address, value):
+        self.sent.append((address, value))
+
+
+class _Dispatcher:
+    """Stub for pythonosc.dispatcher.Dispatcher."""
+
+    def __init__(self):
+        self.handlers = {}
+        self.default_handler = None
+
+    def map(self, address, handler, *args, **kwargs):
+        self.handlers[address] = handler
+
+    def set_default_handler(self, handler, *args, **kwargs):
+        self.default_handler = handler
+
+
+class _BlockingOSCUDPServer:
+    """Stub for pythonosc.osc_server.BlockingOSCUDPServer."""
+
+    def __init__(self, server_address, dispatcher, *args, **kwargs):
+        self.server_address = server_address
+        self.dispatcher = dispatcher
+
+    def serve_forever(self, *args, **kwargs):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+def _install_pythonosc_stub():
+    package = types.ModuleType("pythonosc")
+    package.__path__ = []
+    submodules = {
+        "udp_client": {"SimpleUDPClient": _SimpleUDPClient},
+        "dispatcher": {"Dispatcher": _Dispatcher},
+        "osc_server": {"BlockingOSCUDPServer": _BlockingOSCUDPServer},
+    }
+    for name, attrs in submodules.items():
+        module = types.ModuleType(f"pythonosc.{name}")
+        module.__dict__.update(attrs)
+        setattr(package, name, module)
+        sys.modules[module.__name__] = module
+    sys.modules["pythonosc"] = package
+
+
+# Never shadow the real package: other suites (e.g. integration) share this process
+if importlib.util.find_spec("pythonosc") is None:
+    _install_pythonosc_stub()
@@ -5,7 +5,11 @@ These tests verify the modules' internal logic without requiring
 an actual Ableton connection.
 """
 
+import asyncio
+from types import SimpleNamespace
+
 import pytest
+
 from backend.ableton import (
     AbletonClient,
     AbletonConfig,
@@ -15,6 +19,8 @@ from backend.ableton import (
     DeviceParameter,
 )
 
+pytestmark = pytest.mark.unit
+
 
 class TestAbletonConfig:
     """Tests for AbletonConfig dataclass."""
@@ -173,8 +179,8 @@ class TestAbletonClient:
         assert client._osc_client is None
         assert client._osc_server is None
 
-    def test_controllers_lazy_initialized(self):
-        """Test that controllers are lazily initialized."""
+    def test_controllers_initialized(self):
+        """Test that controllers are built once with the client."""
         client = AbletonClient()
         # Access controllers
         transport = client.transport
@@ -188,3 +194,21 @@ class TestAbletonClient:
         assert client.transport is transport
         assert client.tracks is tracks
         assert client.devices is devices
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_concurrent_requests_matched_by_echoed_args(self):
+        """Test responses to one address reach the request they echo."""
+        client = AbletonClient()
+        client._osc_client = SimpleNamespace(send_message=lambda address, args: None)
+
+        first = asyncio.create_task(client.send_and_wait("/live/track/get/name", 0))
+        second = asyncio.create_task(client.send_and_wait("/live/track/get/name", 1))
+        await asyncio.sleep(0)
+
+        # Replies arrive out of order
+        client._handle_response("/live/track/get/name", 1, "Bass")
+        client._handle_response("/live/track/get/name", 0, "Drums")
+
+        assert await first == (0, "Drums")
+        assert await second == (1, "Bass")
+        assert client._response_queue == {}
@@ -13,6 +13,8 @@ from backend.change_ledger import (
     ChangeType,
 )
 
+pytestmark = pytest.mark.unit
+
 
 class TestChange:
     """Tests for Change dataclass."""
@@ -51,6 +53,17 @@ class TestChange:
         assert d["target"] == "track:4"
         assert d["old_value"] == 0.85
         assert d["new_value"] == 0.5
+        assert d == {
+            "id": "abc123",
+            "timestamp": "2024-01-15T10:30:00",
+            "change_type": "track_volume",
+            "target": "track:4",
+            "old_value": 0.85,
+            "new_value": 0.5,
+            "description": "Set track 4 volume",
+            "reverted": False,
+            "revert_id": None,
+        }
 
 
 class TestChangeType:
@@ -77,13 +90,20 @@ class TestChangeType:
         assert ChangeType.DEVICE_PARAMETER
 
 
+@pytest.fixture(scope="module")
+def _ledger_singleton():
+    """Ledger shared across the module (reset per test by `ledger`)."""
+    return ChangeLedger()
+
+
 class TestChangeLedger:
     """Tests for ChangeLedger."""
 
     @pytest.fixture
-    def ledger(self):
-        """Create empty ledger."""
-        return ChangeLedger()
+    def ledger(self, _ledger_singleton):
+        """Provide an empty ledger."""
+        _ledger_singleton.clear()
+        return _ledger_singleton
 
     def test_empty_ledger(self, ledger):
         """Test empty ledger state."""
@@ -104,42 +124,35 @@ class TestChangeLedger:
         assert ledger.pending_count == 1
         assert change.old_value == 120.0
         assert change.new_value == 95.0
-        assert len(change.id) == 8  # UUID prefix
-
-    def test_auto_description_tempo(self, ledger):
-        """Test auto-generated description for tempo."""
-        change = ledger.record(
-            change_type=ChangeType.TEMPO,
-            target="transport",
-            old_value=120.0,
-            new_value=95.0,
-        )
-        assert "120" in change.description
-        assert "95" in change.description
-        assert "BPM" in change.description
-
-    def test_auto_description_volume(self, ledger):
-        """Test auto-generated description for volume."""
-        change = ledger.record(
-            change_type=ChangeType.TRACK_VOLUME,
-            target="track:4",  # 0-indexed internal
-            old_value=0.85,
-            new_value=0.5,
-        )
-        assert "track 5" in change.description  # 1-indexed for display
-        assert "85%" in change.description
-        assert "50%" in change.description
-
-    def test_auto_description_mute(self, ledger):
-        """Test auto-generated description for mute."""
-        change = ledger.record(
-            change_type=ChangeType.TRACK_MUTE,
-            target="track:2",  # 0-indexed internal
-            old_value=False,
-            new_value=True,
-        )
-        assert "Muted" in change.description
-        assert "track 3" in change.description  # 1-indexed for display
+        assert len(change.id) == 8  # 4 random bytes from the ID pool, as hex
+
+    def test_equality_ignores_id_pool(self, ledger):
+        """Test ledgers with the same changes compare equal, whatever IDs they drew."""
+        ledger.record(ChangeType.TEMPO, "transport", 120.0, 95.0)
+        copy = ChangeLedger(changes=list(ledger.changes))
+
+        assert copy == ledger
+
+    @pytest.mark.parametrize(
+        "change_type, target, old_value, new_value, expected",
+        [
+            (ChangeType.TEMPO, "transport", 120.0, 95.0, ["120", "95", "BPM"]),
+            # Targets are 0-indexed internally, 1-indexed for display
+            (ChangeType.TRACK_VOLUME, "track:4", 0.85, 0.5, ["track 5", "85%", "50%"]),
+            (ChangeType.TRACK_MUTE, "track:2", False, True, ["Muted", "track 3"]),
+            (ChangeType.TRACK_SOLO, "track:0", True, False, ["Unsoloed", "track 1"]),
+            (ChangeType.TRACK_ARM, "track:1", False, True, ["Armed", "track 2"]),
+            (ChangeType.TRACK_CREATE, "track:3", None, "Bass", ["Created", "'Bass'"]),
+            (ChangeType.DEVICE_PARAMETER, "track:0:device:1:param:2", 0.2, 0.7,
+             ["track 1", "device 2", "param 3"]),
+        ],
+        ids=["tempo", "volume", "mute", "solo", "arm", "create", "device"],
+    )
+    def test_auto_description(self, ledger, change_type, target, old_value, new_value, expected):
+        """Test auto-generated descriptions."""
+        change = ledger.record(change_type, target, old_value, new_value)
+        for text in expected:
+            assert text in change.description
 
     def test_custom_description(self, ledger):
         """Test custom description overrides auto."""
@@ -225,10 +238,23 @@ class TestChangeLedger:
         """Test history is trimmed to max."""
         ledger = ChangeLedger(max_history=5)
 
-        for i in range(10):
-            ledger.record(ChangeType.TEMPO, "transport", i, i + 1)
+        ledger.record_many([(ChangeType.TEMPO, "transport", i, i + 1) for i in range(10)])
 
         assert len(ledger.changes) == 5  # Trimmed to max
+        assert ledger.changes[0].old_value == 5  # Oldest changes dropped first
+
+    def test_record_many(self, ledger):
+        """Test recording a batch of changes."""
+        changes = ledger.record_many([
+            (ChangeType.TEMPO, "transport", 120, 100),
+            (ChangeType.TRACK_MUTE, "track:0", False, True, "Muted drums"),
+        ])
+
+        assert list(ledger.changes) == changes
+        assert changes[0].description == "Changed tempo from 120 to 100 BPM"
+        assert changes[1].description == "Muted drums"
+        assert changes[0].id != changes[1].id
+        assert changes[0].timestamp == changes[1].timestamp
 
     def test_get_change_by_id(self, ledger):
         """Test getting change by ID."""
@@ -252,6 +278,19 @@ class TestChangeLedger:
         assert len(ledger.changes) == 0
         assert ledger.pending_count == 0
 
+    def test_clear_keeps_history_limit(self):
+        """Test a cleared ledger can be reused with the same bound."""
+        ledger = ChangeLedger(max_history=3)
+        history = ledger.changes
+        ledger.record_many([(ChangeType.TEMPO, "transport", i, i + 1) for i in range(3)])
+
+        ledger.clear()
+        ledger.record_many([(ChangeType.TEMPO, "transport", i, i + 1) for i in range(5)])
+
+        assert ledger.changes is history  # Cleared in place, not reallocated
+        assert len(ledger.changes) == 3
+        assert ledger.changes[0].old_value == 2
+
     def test_get_reversal_value(self, ledger):
         """Test getting reversal info."""
         change = ledger.record(
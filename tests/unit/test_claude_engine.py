@@ -4,8 +4,10 @@ Unit tests for Claude Engine.
 These tests verify parsing and validation logic without calling the API.
 """
 
+import re
+
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import patch
 
 from backend.claude_engine import (
     ClaudeEngine,
@@ -14,6 +16,21 @@ from backend.claude_engine import (
     SYSTEM_PROMPT,
 )
 
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(scope="module")
+def engine():
+    """Engine with mocked client, shared by the parsing and validation tests."""
+    with patch("anthropic.Anthropic"):
+        return ClaudeEngine(api_key="test-key")
+
+
+@pytest.fixture(scope="module")
+def prompt_tokens():
+    """Quoted keys and bare identifiers in SYSTEM_PROMPT, tokenized once."""
+    return set(re.findall(r'"[a-z_]+"|\b[a-z_]+\b', SYSTEM_PROMPT))
+
 
 class TestClaudeResponse:
     """Tests for ClaudeResponse dataclass."""
@@ -69,11 +86,18 @@ class TestAvailableActions:
 
     def test_set_tempo_params(self):
         """Test set_tempo has correct params."""
-        assert AVAILABLE_ACTIONS["set_tempo"]["params"] == ["bpm"]
+        assert AVAILABLE_ACTIONS["set_tempo"]["params"] == ("bpm",)
 
     def test_create_midi_track_params(self):
         """Test create_midi_track has correct params."""
-        assert AVAILABLE_ACTIONS["create_midi_track"]["params"] == ["name"]
+        assert AVAILABLE_ACTIONS["create_midi_track"]["params"] == ("name",)
+
+    def test_actions_read_only(self):
+        """Test neither the table nor an action's entry can be modified."""
+        with pytest.raises(TypeError):
+            AVAILABLE_ACTIONS["play"]["params"] = ("bpm",)
+        with pytest.raises(TypeError):
+            AVAILABLE_ACTIONS["rewind"] = {"params": ()}
 
 
 class TestSystemPrompt:
@@ -83,30 +107,28 @@ class TestSystemPrompt:
         """Test system prompt is defined."""
         assert len(SYSTEM_PROMPT) > 0
 
-    def test_prompt_includes_actions(self):
+    def test_prompt_includes_actions(self, prompt_tokens):
         """Test system prompt documents available actions."""
-        assert "create_midi_track" in SYSTEM_PROMPT
-        assert "set_tempo" in SYSTEM_PROMPT
-        assert "set_track_volume" in SYSTEM_PROMPT
+        assert "create_midi_track" in prompt_tokens
+        assert "set_tempo" in prompt_tokens
+        assert "set_track_volume" in prompt_tokens
 
-    def test_prompt_includes_json_format(self):
+    def test_prompt_includes_json_format(self, prompt_tokens):
         """Test system prompt specifies JSON response format."""
-        assert '"thinking"' in SYSTEM_PROMPT
-        assert '"commands"' in SYSTEM_PROMPT
-        assert '"response"' in SYSTEM_PROMPT
+        assert '"thinking"' in prompt_tokens
+        assert '"commands"' in prompt_tokens
+        assert '"response"' in prompt_tokens
 
 
 class TestClaudeEngineInit:
     """Tests for ClaudeEngine initialization."""
 
-    def test_raises_without_api_key(self):
+    def test_raises_without_api_key(self, monkeypatch):
         """Test raises error when no API key provided."""
-        with patch.dict("os.environ", {}, clear=True):
-            with patch("backend.claude_engine.config") as mock_config:
-                mock_config.anthropic_api_key = ""
-                with pytest.raises(ValueError) as exc:
-                    ClaudeEngine()
-                assert "API key" in str(exc.value)
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        monkeypatch.setattr("backend.claude_engine.config.anthropic_api_key", "")
+        with pytest.raises(ValueError, match="API key"):
+            ClaudeEngine()
 
     def test_accepts_api_key_parameter(self):
         """Test accepts API key as parameter."""
@@ -118,12 +140,6 @@ class TestClaudeEngineInit:
 class TestClaudeEngineParseResponse:
     """Tests for response parsing logic."""
 
-    @pytest.fixture
-    def engine(self):
-        """Create engine with mocked client."""
-        with patch("anthropic.Anthropic"):
-            return ClaudeEngine(api_key="test-key")
-
     def test_parse_valid_json(self, engine):
         """Test parsing valid JSON response."""
         text = '''{
@@ -165,6 +181,14 @@ class TestClaudeEngineParseResponse:
         assert result.thinking == "Test"
         assert result.response == "Done."
 
+    def test_parse_json_with_unclosed_code_block(self, engine):
+        """Test parsing JSON when the closing fence is missing."""
+        text = '''```json
+{"thinking": "Test", "commands": [], "response": "Done."}'''
+        result = engine._parse_response(text)
+        assert result.error is None
+        assert result.response == "Done."
+
     def test_parse_invalid_json(self, engine):
         """Test parsing invalid JSON returns error."""
         text = "This is not JSON at all"
@@ -187,12 +211,6 @@ class TestClaudeEngineParseResponse:
 class TestClaudeEngineValidateCommands:
     """Tests for command validation."""
 
-    @pytest.fixture
-    def engine(self):
-        """Create engine with mocked client."""
-        with patch("anthropic.Anthropic"):
-            return ClaudeEngine(api_key="test-key")
-
     def test_validate_valid_command(self, engine):
         """Test validating a valid command."""
         commands = [{"action": "set_tempo", "params": {"bpm": 120}}]
@@ -231,12 +249,6 @@ class TestClaudeEngineValidateCommands:
 class TestClaudeEngineBuildUserMessage:
     """Tests for building user message with context."""
 
-    @pytest.fixture
-    def engine(self):
-        """Create engine with mocked client."""
-        with patch("anthropic.Anthropic"):
-            return ClaudeEngine(api_key="test-key")
-
     def test_message_with_no_state(self, engine):
         """Test building message without session state."""
         result = engine._build_user_message("create a track", {})
@@ -1,11 +1,10 @@
 """
 Unit tests for Command Executor.
 
-These tests verify the executor logic using mocked Ableton client.
+These tests verify the executor logic using a stub Ableton client.
 """
 
 import pytest
-from unittest.mock import AsyncMock, MagicMock
 
 from backend.executor import (
     CommandExecutor,
@@ -13,6 +12,20 @@ from backend.executor import (
     ExecutionReport,
 )
 from backend.change_ledger import ChangeLedger, ChangeType
+from tests.mocks.ableton import (
+    assert_called_once,
+    assert_called_once_with,
+    assert_called_with,
+    make_client,
+    reset_client,
+)
+
+pytestmark = [
+    pytest.mark.unit,
+    pytest.mark.asyncio(loop_scope="module"),
+    # The module-wide asyncio mark also lands on the sync tests; that's fine
+    pytest.mark.filterwarnings("ignore:.*marked with '@pytest.mark.asyncio' but it is not an async function"),
+]
 
 
 class TestExecutionResult:
@@ -86,81 +99,83 @@ class TestExecutionReport:
         assert report.all_success is False
 
 
+# (action, params, client method, expected call args, recorded in ledger)
+DISPATCH_CASES = [
+    pytest.param("play", {}, lambda c: c.transport.play, (), False, id="play"),
+    pytest.param("stop", {}, lambda c: c.transport.stop, (), False, id="stop"),
+    pytest.param("set_tempo", {"bpm": 100.0}, lambda c: c.transport.set_tempo, (100.0,), True, id="set_tempo"),
+    pytest.param("toggle_metronome", {}, lambda c: c.transport.toggle_metronome, (), False, id="toggle_metronome"),
+    pytest.param("create_midi_track", {"name": "Bass"}, lambda c: c.tracks.create_midi, ("Bass",), True, id="create_midi_track"),
+    pytest.param("create_audio_track", {"name": "Vox"}, lambda c: c.tracks.create_audio, ("Vox",), True, id="create_audio_track"),
+    pytest.param("delete_track", {"track_index": 2}, lambda c: c.tracks.delete, (2,), False, id="delete_track"),
+    pytest.param("set_track_volume", {"track_index": 0, "volume": 0.5}, lambda c: c.tracks.set_volume, (0, 0.5), True, id="set_track_volume"),
+    pytest.param("set_track_pan", {"track_index": 1, "pan": -0.5}, lambda c: c.tracks.set_pan, (1, -0.5), True, id="set_track_pan"),
+    pytest.param("set_track_mute", {"track_index": 0, "muted": True}, lambda c: c.tracks.set_mute, (0, True), True, id="set_track_mute"),
+    pytest.param("set_track_solo", {"track_index": 0, "soloed": True}, lambda c: c.tracks.set_solo, (0, True), True, id="set_track_solo"),
+    pytest.param("set_track_arm", {"track_index": 3, "armed": True}, lambda c: c.tracks.set_arm, (3, True), True, id="set_track_arm"),
+    pytest.param(
+        "set_device_parameter",
+        {"track_index": 0, "device_index": 1, "param_index": 3, "value": 0.7},
+        lambda c: c.devices.set_parameter, (0, 1, 3, 0.7), True,
+        id="set_device_parameter",
+    ),
+]
+
+# (action, params, expected result fields)
+RESULT_CASES = [
+    pytest.param("set_tempo", {"bpm": 100.0}, {"tempo": 100.0, "previous": 120.0}, id="set_tempo"),
+    pytest.param("create_midi_track", {"name": "Bass"}, {"name": "Bass", "type": "midi"}, id="create_midi_track"),
+    pytest.param("set_track_volume", {"track_index": 0, "volume": 0.5}, {"previous": 0.85}, id="set_track_volume"),
+    pytest.param(
+        "set_device_parameter",
+        {"track_index": 0, "device_index": 1, "param_index": 3, "value": 0.7},
+        {"previous": 0.5},
+        id="set_device_parameter",
+    ),
+]
+
+
+@pytest.fixture(scope="class")
+def mock_client():
+    """Create a stub Ableton client, shared by the tests in a class."""
+    return make_client()
+
+
+@pytest.fixture(scope="class")
+def executor(mock_client):
+    """Create executor with mock client."""
+    return CommandExecutor(mock_client)
+
+
 class TestCommandExecutor:
     """Tests for CommandExecutor."""
 
-    @pytest.fixture
-    def mock_client(self):
-        """Create a mock Ableton client."""
-        client = MagicMock()
-
-        # Mock transport
-        client.transport = MagicMock()
-        client.transport.play = AsyncMock()
-        client.transport.stop = AsyncMock()
-        client.transport.get_tempo = AsyncMock(return_value=120.0)
-        client.transport.set_tempo = AsyncMock()
-        client.transport.toggle_metronome = AsyncMock()
-
-        # Mock tracks
-        client.tracks = MagicMock()
-        client.tracks.create_midi = AsyncMock(return_value=0)
-        client.tracks.create_audio = AsyncMock(return_value=1)
-        client.tracks.delete = AsyncMock()
-        client.tracks.get_volume = AsyncMock(return_value=0.85)
-        client.tracks.set_volume = AsyncMock()
-        client.tracks.get_pan = AsyncMock(return_value=0.0)
-        client.tracks.set_pan = AsyncMock()
-        client.tracks.get_mute = AsyncMock(return_value=False)
-        client.tracks.set_mute = AsyncMock()
-        client.tracks.get_solo = AsyncMock(return_value=False)
-        client.tracks.set_solo = AsyncMock()
-        client.tracks.get_arm = AsyncMock(return_value=False)
-        client.tracks.set_arm = AsyncMock()
-
-        # Mock devices
-        client.devices = MagicMock()
-        client.devices.get_parameter = AsyncMock(return_value=0.5)
-        client.devices.set_parameter = AsyncMock()
-
-        return client
-
-    @pytest.fixture
-    def executor(self, mock_client):
-        """Create executor with mock client."""
-        return CommandExecutor(mock_client)
-
-    @pytest.mark.asyncio
-    async def test_execute_play(self, executor, mock_client):
-        """Test executing play command."""
-        commands = [{"action": "play", "params": {}}]
-        report = await executor.execute(commands)
+    @pytest.fixture(autouse=True)
+    def _reset(self, mock_client, executor):
+        """Give each test clean call history, side effects and ledger."""
+        yield
+        reset_client(mock_client)
+        executor.ledger.clear()
+
+    @pytest.mark.parametrize("action, params, method, expected_args, records", DISPATCH_CASES)
+    async def test_execute_dispatch(self, executor, mock_client, action, params, method, expected_args, records):
+        """Test each action calls the matching client method."""
+        report = await executor.execute([{"action": action, "params": params}])
 
         assert report.success_count == 1
         assert report.error_count == 0
-        mock_client.transport.play.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_execute_stop(self, executor, mock_client):
-        """Test executing stop command."""
-        commands = [{"action": "stop", "params": {}}]
-        report = await executor.execute(commands)
+        assert_called_once_with(method(mock_client), *expected_args)
+        assert executor.ledger.pending_count == (1 if records else 0)
 
-        assert report.success_count == 1
-        mock_client.transport.stop.assert_called_once()
+    @pytest.mark.parametrize("action, params, expected", RESULT_CASES)
+    async def test_execute_result(self, executor, action, params, expected):
+        """Test results report new and previous values."""
+        report = await executor.execute([{"action": action, "params": params}])
 
-    @pytest.mark.asyncio
-    async def test_execute_set_tempo(self, executor, mock_client):
-        """Test executing set_tempo command."""
-        commands = [{"action": "set_tempo", "params": {"bpm": 100.0}}]
-        report = await executor.execute(commands)
+        result = report.results[0].result
+        for key, value in expected.items():
+            assert result[key] == value
 
-        assert report.success_count == 1
-        mock_client.transport.set_tempo.assert_called_once_with(100.0)
-        assert report.results[0].result["tempo"] == 100.0
-        assert report.results[0].result["previous"] == 120.0
-
-    @pytest.mark.asyncio
     async def test_execute_set_tempo_records_change(self, executor):
         """Test set_tempo records to ledger."""
         commands = [{"action": "set_tempo", "params": {"bpm": 100.0}}]
@@ -172,17 +187,6 @@ class TestCommandExecutor:
         assert change.old_value == 120.0
         assert change.new_value == 100.0
 
-    @pytest.mark.asyncio
-    async def test_execute_create_midi_track(self, executor, mock_client):
-        """Test executing create_midi_track command."""
-        commands = [{"action": "create_midi_track", "params": {"name": "Bass"}}]
-        report = await executor.execute(commands)
-
-        assert report.success_count == 1
-        mock_client.tracks.create_midi.assert_called_once_with("Bass")
-        assert report.results[0].result["name"] == "Bass"
-
-    @pytest.mark.asyncio
     async def test_execute_create_track_records_change(self, executor):
         """Test create_track records to ledger."""
         commands = [{"action": "create_midi_track", "params": {"name": "Synth"}}]
@@ -193,54 +197,6 @@ class TestCommandExecutor:
         assert change.change_type == ChangeType.TRACK_CREATE
         assert change.new_value == "Synth"
 
-    @pytest.mark.asyncio
-    async def test_execute_set_track_volume(self, executor, mock_client):
-        """Test executing set_track_volume command."""
-        commands = [{"action": "set_track_volume", "params": {"track_index": 0, "volume": 0.5}}]
-        report = await executor.execute(commands)
-
-        assert report.success_count == 1
-        mock_client.tracks.set_volume.assert_called_once_with(0, 0.5)
-        assert report.results[0].result["previous"] == 0.85
-
-    @pytest.mark.asyncio
-    async def test_execute_set_track_pan(self, executor, mock_client):
-        """Test executing set_track_pan command."""
-        commands = [{"action": "set_track_pan", "params": {"track_index": 1, "pan": -0.5}}]
-        report = await executor.execute(commands)
-
-        assert report.success_count == 1
-        mock_client.tracks.set_pan.assert_called_once_with(1, -0.5)
-
-    @pytest.mark.asyncio
-    async def test_execute_set_track_mute(self, executor, mock_client):
-        """Test executing set_track_mute command."""
-        commands = [{"action": "set_track_mute", "params": {"track_index": 0, "muted": True}}]
-        report = await executor.execute(commands)
-
-        assert report.success_count == 1
-        mock_client.tracks.set_mute.assert_called_once_with(0, True)
-        assert executor.ledger.pending_count == 1
-
-    @pytest.mark.asyncio
-    async def test_execute_set_device_parameter(self, executor, mock_client):
-        """Test executing set_device_parameter command."""
-        commands = [{
-            "action": "set_device_parameter",
-            "params": {
-                "track_index": 0,
-                "device_index": 1,
-                "param_index": 3,
-                "value": 0.7
-            }
-        }]
-        report = await executor.execute(commands)
-
-        assert report.success_count == 1
-        mock_client.devices.set_parameter.assert_called_once_with(0, 1, 3, 0.7)
-        assert report.results[0].result["previous"] == 0.5
-
-    @pytest.mark.asyncio
     async def test_execute_unknown_action(self, executor):
         """Test executing unknown action."""
         commands = [{"action": "unknown_action", "params": {}}]
@@ -250,7 +206,23 @@ class TestCommandExecutor:
         assert report.error_count == 1
         assert "No handler" in report.results[0].error
 
-    @pytest.mark.asyncio
+    async def test_execute_uses_subclass_handlers(self, mock_client):
+        """Test a subclass can override a handler and add a new action."""
+        class Executor(CommandExecutor):
+            async def _do_play(self):
+                return {"playing": "overridden"}, None
+
+            async def _do_ping(self):
+                return {"pong": True}, None
+
+        report = await Executor(mock_client).execute([
+            {"action": "play", "params": {}},
+            {"action": "ping", "params": {}},
+        ])
+
+        assert [r.result for r in report.results] == [{"playing": "overridden"}, {"pong": True}]
+        assert mock_client.transport.play.calls == []
+
     async def test_execute_multiple_commands(self, executor, mock_client):
         """Test executing multiple commands."""
         commands = [
@@ -262,11 +234,10 @@ class TestCommandExecutor:
 
         assert report.success_count == 3
         assert report.error_count == 0
-        mock_client.transport.set_tempo.assert_called_once_with(100)
-        mock_client.tracks.create_midi.assert_called_once_with("Lead")
-        mock_client.transport.play.assert_called_once()
+        assert_called_once_with(mock_client.transport.set_tempo, 100)
+        assert_called_once_with(mock_client.tracks.create_midi, "Lead")
+        assert_called_once(mock_client.transport.play)
 
-    @pytest.mark.asyncio
     async def test_execute_handles_exception(self, executor, mock_client):
         """Test executor handles exceptions gracefully."""
         mock_client.transport.play.side_effect = Exception("Connection lost")
@@ -282,35 +253,14 @@ class TestCommandExecutor:
 class TestCommandExecutorUndo:
     """Tests for undo functionality."""
 
-    @pytest.fixture
-    def mock_client(self):
-        """Create a mock Ableton client."""
-        client = MagicMock()
-
-        client.transport = MagicMock()
-        client.transport.get_tempo = AsyncMock(return_value=120.0)
-        client.transport.set_tempo = AsyncMock()
-
-        client.tracks = MagicMock()
-        client.tracks.get_volume = AsyncMock(return_value=0.85)
-        client.tracks.set_volume = AsyncMock()
-        client.tracks.get_mute = AsyncMock(return_value=False)
-        client.tracks.set_mute = AsyncMock()
-        client.tracks.delete = AsyncMock()
-        client.tracks.create_midi = AsyncMock(return_value=5)
-
-        client.devices = MagicMock()
-        client.devices.get_parameter = AsyncMock(return_value=0.5)
-        client.devices.set_parameter = AsyncMock()
-
-        return client
-
-    @pytest.fixture
-    def executor(self, mock_client):
-        """Create executor with mock client."""
-        return CommandExecutor(mock_client)
+    @pytest.fixture(autouse=True)
+    def _reset(self, mock_client, executor):
+        """Give each test clean call history, side effects and ledger."""
+        mock_client.tracks.create_midi.return_value = 5
+        yield
+        reset_client(mock_client)
+        executor.ledger.clear()
 
-    @pytest.mark.asyncio
     async def test_undo_tempo(self, executor, mock_client):
         """Test undoing tempo change."""
         # Make a change
@@ -322,9 +272,8 @@ class TestCommandExecutorUndo:
         assert len(results) == 1
         assert results[0].success is True
         # Should set back to 120 (the old value)
-        mock_client.transport.set_tempo.assert_called_with(120.0)
+        assert_called_with(mock_client.transport.set_tempo, 120.0)
 
-    @pytest.mark.asyncio
     async def test_undo_mute(self, executor, mock_client):
         """Test undoing mute."""
         # Make a change
@@ -336,9 +285,8 @@ class TestCommandExecutorUndo:
         assert len(results) == 1
         assert results[0].success is True
         # Should set back to False (unmuted)
-        mock_client.tracks.set_mute.assert_called_with(0, False)
+        assert_called_with(mock_client.tracks.set_mute, 0, False)
 
-    @pytest.mark.asyncio
     async def test_undo_track_create(self, executor, mock_client):
         """Test undoing track creation (deletes the track)."""
         # Create a track
@@ -349,9 +297,8 @@ class TestCommandExecutorUndo:
 
         assert len(results) == 1
         assert results[0].success is True
-        mock_client.tracks.delete.assert_called_once_with(5)  # The created track index
+        assert_called_once_with(mock_client.tracks.delete, 5)  # The created track index
 
-    @pytest.mark.asyncio
     async def test_undo_multiple(self, executor, mock_client):
         """Test undoing multiple changes."""
         # Make multiple changes
@@ -369,13 +316,11 @@ class TestCommandExecutorUndo:
         assert all(r.success for r in results)
         assert executor.ledger.pending_count == 0
 
-    @pytest.mark.asyncio
     async def test_undo_nothing_to_undo(self, executor):
         """Test undo when nothing to undo."""
         results = await executor.undo(1)
         assert len(results) == 0
 
-    @pytest.mark.asyncio
     async def test_undo_marks_reverted(self, executor, mock_client):
         """Test undo marks change as reverted."""
         await executor.execute([{"action": "set_tempo", "params": {"bpm": 100}}])
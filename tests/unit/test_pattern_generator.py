@@ -0,0 +1,241 @@
+"""
+Unit tests for the beat machine's pattern generator.
+
+beat-machine/ is a standalone script directory rather than a package, so the
+module is loaded from its file path.
+"""
+
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+# orjson is a beat-machine dependency, not part of the root requirements
+pytest.importorskip("orjson")
+
+_PATH = Path(__file__).parents[2] / "beat-machine" / "pattern_generator.py"
+_spec = importlib.util.spec_from_file_location("pattern_generator", _PATH)
+pattern_generator = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(pattern_generator)
+
+
+REPLY = 'Here you go:\n```json\n{"bpm": 90, "instruments": {"BD": {"steps": [100]}}}\n```'
+
+
+class _FakeStream:
+    """Stands in for the context manager returned by client.messages.stream()."""
+
+    def __init__(self, text: str):
+        self.text_stream = [text]
+
+    def get_final_message(self):
+        return SimpleNamespace(usage=SimpleNamespace(input_tokens=10, cache_read_input_tokens=2000))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _FakeMessages:
+    """Records stream() calls and answers each with a canned reply."""
+
+    def __init__(self, reply: str):
+        self.reply = reply
+        self.calls: list[dict] = []
+
+    def stream(self, **kwargs):
+        self.calls.append(kwargs)
+        return _FakeStream(self.reply)
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    """PatternGenerator whose API client is replaced by a fake."""
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    gen = pattern_generator.PatternGenerator()
+    gen.client = SimpleNamespace(messages=_FakeMessages(REPLY))
+    return gen
+
+
+def _conversation(request: str) -> list[dict]:
+    """A user turn with the playing pattern appended, as main.py sends it."""
+    content = f"{request}\n\n{pattern_generator.PATTERN_CONTEXT_MARKER} ...]"
+    return [{"role": "user", "content": content}]
+
+
+class TestIsSimpleEdit:
+    """Tests for routing short pattern tweaks to the faster model."""
+
+    @pytest.mark.parametrize("request_text", [
+        "make it busier",
+        "make it busier!",
+        "less hats?",
+        "Add a clap, please.",
+        "mute the kick; it's muddy",
+    ])
+    def test_short_tweaks(self, request_text):
+        """Test short edits are detected despite punctuation."""
+        assert pattern_generator._is_simple_edit(_conversation(request_text))
+
+    @pytest.mark.parametrize("request_text", [
+        "give me a halftime trap beat",
+        "more " + "cowbell " * 20,
+    ])
+    def test_not_simple(self, request_text):
+        """Test new patterns and long requests keep the full budget."""
+        assert not pattern_generator._is_simple_edit(_conversation(request_text))
+
+    def test_needs_playing_pattern(self):
+        """Test an edit word alone is not enough without a pattern to edit."""
+        assert not pattern_generator._is_simple_edit([{"role": "user", "content": "busier!"}])
+
+
+def _split(text: str) -> tuple[str | None, str]:
+    """Apply _find_json_block the way generate() does: (json, message)."""
+    found = pattern_generator._find_json_block(text)
+    if found is None:
+        return None, text.strip()
+    start, end, cut_start, cut_end = found
+    return text[start:end], (text[:cut_start] + text[cut_end:]).strip()
+
+
+class TestFindJsonBlock:
+    """Tests for splitting Claude's reply into pattern JSON and message."""
+
+    def test_fenced_block(self):
+        """Test a ```json fence is extracted and dropped from the message."""
+        text = 'Here you go:\n```json\n{"bpm": 90, "instruments": {}}\n```\nEnjoy!'
+        block, message = _split(text)
+        assert block == '{"bpm": 90, "instruments": {}}'
+        assert message == "Here you go:\n\nEnjoy!"
+
+    def test_braces_and_escaped_quotes_in_strings(self):
+        """Test braces and escaped quotes inside string values don't end the object."""
+        body = '{"name": "a } \\" { b", "instruments": {"BD": {"steps": [1]}}}'
+        block, message = _split(f"```json\n{body}\n```")
+        assert block == body
+        assert message == ""
+
+    def test_raw_object_without_fence(self):
+        """Test a bare object mentioning instruments is found, leaving the message intact."""
+        text = 'Try this {"instruments": {}} groove'
+        block, message = _split(text)
+        assert block == '{"instruments": {}}'
+        assert message == text
+
+    def test_raw_object_needs_instruments(self):
+        """Test a bare object without instruments isn't taken for a pattern."""
+        assert pattern_generator._find_json_block('Use {"bpm": 90}') is None
+
+    def test_unclosed_fence_falls_back_to_raw_object(self):
+        """Test an unclosed fence still yields the object, without cutting the message."""
+        text = 'Here:\n```json\n{"instruments": {}}\n'
+        block, message = _split(text)
+        assert block == '{"instruments": {}}'
+        assert message == text.strip()
+
+    def test_unclosed_object(self):
+        """Test a truncated object is not returned."""
+        assert pattern_generator._find_json_block('```json\n{"instruments": {') is None
+
+
+class TestResponseCache:
+    """Tests for answering repeated conversations from memory."""
+
+    def test_hit_skips_api(self, generator):
+        """Test an identical conversation is answered without another API call."""
+        first = generator.generate([{"role": "user", "content": "house beat"}])
+        second = generator.generate([{"role": "user", "content": "house beat"}])
+
+        assert second == first
+        assert len(generator.client.messages.calls) == 1
+
+    def test_hit_returns_independent_copy(self, generator):
+        """Test mutating a returned pattern doesn't change what the cache returns."""
+        conversation = [{"role": "user", "content": "house beat"}]
+        _, pattern = generator.generate(conversation)
+        pattern["bpm"] = 200
+        _, cached = generator.generate(conversation)
+        cached["instruments"]["BD"]["steps"][0] = 1
+
+        _, again = generator.generate(conversation)
+        assert again["bpm"] == 90
+        assert again["instruments"]["BD"]["steps"][0] == 100
+
+    def test_evicts_oldest(self, generator):
+        """Test the least recently used conversation is dropped past the size limit."""
+        size = pattern_generator.RESPONSE_CACHE_SIZE
+        for i in range(size + 1):
+            generator.generate([{"role": "user", "content": f"beat {i}"}])
+        calls = generator.client.messages.calls
+
+        generator.generate([{"role": "user", "content": "beat 1"}])
+        assert len(calls) == size + 1
+        generator.generate([{"role": "user", "content": "beat 0"}])
+        assert len(calls) == size + 2
+
+
+class TestValidatePattern:
+    """Tests for filling in and clamping a parsed pattern."""
+
+    def test_defaults(self, generator):
+        """Test missing fields get defaults."""
+        assert generator._validate_pattern({}) == {"bpm": 120, "swing": 0, "instruments": {}}
+
+    @pytest.mark.parametrize("swing, expected", [(-10, 0), (55, 55), (150, 100)])
+    def test_swing_clamped(self, generator, swing, expected):
+        """Test swing is clamped to 0-100."""
+        assert generator._validate_pattern({"swing": swing})["swing"] == expected
+
+    def test_velocities_clamped(self, generator):
+        """Test step velocities are clamped to 0-127 and made ints."""
+        pattern = generator._validate_pattern({"instruments": {"BD": {"steps": [-5, 64.7, 200]}}})
+        assert pattern["instruments"]["BD"]["steps"][:3] == [0, 64, 127]
+
+    def test_short_steps_padded(self, generator):
+        """Test short step lists are padded with rests to 64 steps."""
+        pattern = generator._validate_pattern({"instruments": {"BD": {"steps": [100] * 16}, "SD": {}}})
+        assert pattern["instruments"]["BD"]["steps"] == [100] * 16 + [0] * 48
+        assert pattern["instruments"]["SD"]["steps"] == [0] * 64
+
+    def test_long_steps_truncated(self, generator):
+        """Test step lists longer than 4 bars are cut to 64 steps."""
+        pattern = generator._validate_pattern({"instruments": {"CH": {"steps": [80] * 70}}})
+        assert pattern["instruments"]["CH"]["steps"] == [80] * 64
+
+
+class TestHistoryBreakpoint:
+    """Tests for prompt-caching the conversation history."""
+
+    def test_breakpoint_on_last_history_message(self, generator):
+        """Test the message before the new turn is marked, without touching the caller's list."""
+        conversation = [
+            {"role": "user", "content": "house beat"},
+            {"role": "assistant", "content": "Four on the floor."},
+            {"role": "user", "content": "busier"},
+        ]
+        generator.generate(conversation)
+
+        sent = generator.client.messages.calls[0]["messages"]
+        assert sent[0] == conversation[0]
+        assert sent[1]["content"] == [
+            {"type": "text", "text": "Four on the floor.", "cache_control": {"type": "ephemeral"}},
+        ]
+        assert sent[2] == conversation[2]
+        assert conversation[1]["content"] == "Four on the floor."
+
+    def test_first_turn_unchanged(self, generator):
+        """Test a single-message conversation has no history to mark."""
+        conversation = [{"role": "user", "content": "house beat"}]
+        generator.generate(conversation)
+        assert generator.client.messages.calls[0]["messages"] == conversation
+
+    def test_records_usage(self, generator):
+        """Test usage from the final message is kept for checking cache reads."""
+        generator.generate([{"role": "user", "content": "house beat"}])
+        assert generator.last_usage.cache_read_input_tokens == 2000
@@ -1,18 +1,71 @@
 """
 Unit tests for Session Cache.
 
-These tests verify the session caching logic using mocked Ableton client.
+These tests verify the session caching logic using a stub Ableton client.
+
+They touch no files or globals: the stub client template is session-scoped
+(built once per xdist worker) and copied per test, so the module is safe to
+run in parallel, e.g. `pytest -n auto --dist=loadfile tests/unit/test_session_cache.py`.
 """
 
+from dataclasses import FrozenInstanceError
+
 import pytest
-from unittest.mock import AsyncMock, MagicMock
 
 from backend.session_cache import (
+    LOOKUP_CACHE_SIZE,
     SessionCache,
     SessionState,
     CachedTrack,
     CachedDevice,
 )
+from tests.mocks.ableton import copy_client, make_client
+
+pytestmark = [
+    pytest.mark.unit,
+    pytest.mark.asyncio(loop_scope="module"),
+    # The module-wide asyncio mark also lands on the sync tests; that's fine
+    pytest.mark.filterwarnings("ignore:.*marked with '@pytest.mark.asyncio' but it is not an async function"),
+]
+
+# Expected defaults, spelled out so that changing any default fails a test
+DEFAULT_SESSION_STATE = SessionState(
+    tempo=120.0, playing=False, recording=False, metronome=False, tracks=(),
+)
+DEFAULT_TRACK = CachedTrack(
+    index=0, name="Test", type="midi", volume=0.85, pan=0.0,
+    muted=False, soloed=False, armed=False, devices=(),
+)
+DEFAULT_DEVICE = CachedDevice(index=0, name="Compressor", class_name="", type="")
+
+
+@pytest.fixture(scope="session")
+def _client_template():
+    """Stub client for a two-track session, configured once and copied per test."""
+    client = make_client()
+
+    # Transport
+    client.transport.get_tempo.return_value = 120.0
+    client.transport.is_playing.return_value = False
+    client.transport.is_recording.return_value = False
+    client.transport.get_metronome.return_value = False
+
+    # Tracks
+    client.tracks.get_count.return_value = 2
+    client.tracks.get_name.side_effect = ("Drums", "Bass").__getitem__
+    client.tracks.get_volume.return_value = 0.85
+    client.tracks.get_pan.return_value = 0.0
+    client.tracks.get_mute.return_value = False
+    client.tracks.get_solo.return_value = False
+    client.tracks.get_arm.return_value = False
+
+    # Devices
+    client.devices.get_count.return_value = 1
+    client.devices.get_name.return_value = "Drum Rack"
+    client.devices.get_class_name.return_value = "DrumGroupDevice"
+    client.devices.get_type.return_value = "instrument"
+
+    return client
 
 
 class TestSessionState:
@@ -20,12 +73,7 @@ class TestSessionState:
 
     def test_default_values(self):
         """Test default session state."""
-        state = SessionState()
-        assert state.tempo == 120.0
-        assert state.playing is False
-        assert state.recording is False
-        assert state.metronome is False
-        assert state.tracks == []
+        assert SessionState() == DEFAULT_SESSION_STATE
 
     def test_to_dict(self):
         """Test converting to dictionary."""
@@ -58,14 +106,7 @@ class TestCachedTrack:
 
     def test_default_values(self):
         """Test default track values."""
-        track = CachedTrack(index=0, name="Test")
-        assert track.type == "midi"
-        assert track.volume == 0.85
-        assert track.pan == 0.0
-        assert track.muted is False
-        assert track.soloed is False
-        assert track.armed is False
-        assert track.devices == []
+        assert CachedTrack(index=0, name="Test") == DEFAULT_TRACK
 
     def test_with_devices(self):
         """Test track with devices."""
@@ -81,15 +122,48 @@ class TestCachedTrack:
         assert track.devices[0].name == "Wavetable"
         assert track.devices[1].name == "Reverb"
 
+    def test_to_dict(self):
+        """Test track dict rounds mix values and nests devices."""
+        track = CachedTrack(
+            index=2,
+            name="Pad",
+            volume=0.71234,
+            pan=-0.3333,
+            devices=[CachedDevice(index=0, name="Reverb", class_name="Reverb", type="audio_effect")],
+        )
+        assert track.to_dict() == {
+            "index": 2,
+            "name": "Pad",
+            "type": "midi",
+            "volume": 0.71,
+            "pan": -0.33,
+            "muted": False,
+            "soloed": False,
+            "armed": False,
+            "devices": [{"index": 0, "name": "Reverb", "class_name": "Reverb", "type": "audio_effect"}],
+        }
+
+    def test_name_lower(self):
+        """Test the lowercased search name is derived from the name."""
+        track = CachedTrack(index=0, name="Bass Synth")
+        assert track.name_lower == "bass synth"
+        assert CachedDevice(index=0, name="Drum Rack").name_lower == "drum rack"
+
+    def test_frozen_and_hashable(self):
+        """Test tracks are immutable values, usable in sets and as cache keys."""
+        track = CachedTrack(index=0, name="Synth", devices=[CachedDevice(index=0, name="Reverb")])
+        assert isinstance(track.devices, tuple)
+        assert {track, CachedTrack(index=0, name="Synth", devices=(CachedDevice(index=0, name="Reverb"),))} == {track}
+        with pytest.raises(FrozenInstanceError):
+            track.name = "Pad"
+
 
 class TestCachedDevice:
     """Tests for CachedDevice dataclass."""
 
     def test_default_values(self):
         """Test default device values."""
-        device = CachedDevice(index=0, name="Compressor")
-        assert device.class_name == ""
-        assert device.type == ""
+        assert CachedDevice(index=0, name="Compressor") == DEFAULT_DEVICE
 
     def test_with_values(self):
         """Test device with values."""
@@ -107,35 +181,9 @@ class TestSessionCache:
     """Tests for SessionCache."""
 
     @pytest.fixture
-    def mock_client(self):
-        """Create a mock Ableton client."""
-        client = MagicMock()
-
-        # Mock transport
-        client.transport = MagicMock()
-        client.transport.get_tempo = AsyncMock(return_value=120.0)
-        client.transport.is_playing = AsyncMock(return_value=False)
-        client.transport.is_recording = AsyncMock(return_value=False)
-        client.transport.get_metronome = AsyncMock(return_value=False)
-
-        # Mock tracks
-        client.tracks = MagicMock()
-        client.tracks.get_count = AsyncMock(return_value=2)
-        client.tracks.get_name = AsyncMock(side_effect=["Drums", "Bass"])
-        client.tracks.get_volume = AsyncMock(return_value=0.85)
-        client.tracks.get_pan = AsyncMock(return_value=0.0)
-        client.tracks.get_mute = AsyncMock(return_value=False)
-        client.tracks.get_solo = AsyncMock(return_value=False)
-        client.tracks.get_arm = AsyncMock(return_value=False)
-
-        # Mock devices
-        client.devices = MagicMock()
-        client.devices.get_count = AsyncMock(return_value=1)
-        client.devices.get_name = AsyncMock(return_value="Drum Rack")
-        client.devices.get_class_name = AsyncMock(return_value="DrumGroupDevice")
-        client.devices.get_type = AsyncMock(return_value="instrument")
-
-        return client
+    def mock_client(self, _client_template):
+        """Copy of the stub client, with call logs of its own."""
+        return copy_client(_client_template)
 
     @pytest.fixture
     def cache(self, mock_client):
@@ -145,21 +193,19 @@ class TestSessionCache:
     def test_initial_state(self, cache):
         """Test cache starts with default state."""
         assert cache.state.tempo == 120.0
-        assert cache.state.tracks == []
+        assert cache.state.tracks == ()
 
-    @pytest.mark.asyncio
     async def test_refresh_transport(self, cache, mock_client):
         """Test refreshing transport state."""
-        mock_client.transport.get_tempo = AsyncMock(return_value=95.0)
-        mock_client.transport.is_playing = AsyncMock(return_value=True)
-        mock_client.tracks.get_count = AsyncMock(return_value=0)
+        mock_client.transport.get_tempo.return_value = 95.0
+        mock_client.transport.is_playing.return_value = True
+        mock_client.tracks.get_count.return_value = 0
 
         await cache.refresh()
 
         assert cache.state.tempo == 95.0
         assert cache.state.playing is True
 
-    @pytest.mark.asyncio
     async def test_refresh_tracks(self, cache, mock_client):
         """Test refreshing track state."""
         await cache.refresh()
@@ -167,17 +213,18 @@ class TestSessionCache:
         assert len(cache.state.tracks) == 2
         assert cache.state.tracks[0].name == "Drums"
         assert cache.state.tracks[1].name == "Bass"
+        # One name query per track, issued together
+        assert [args for args, _ in mock_client.tracks.get_name.calls] == [(0,), (1,)]
 
-    @pytest.mark.asyncio
     async def test_refresh_without_devices(self, cache, mock_client):
         """Test refreshing without device info."""
         await cache.refresh(include_devices=False)
 
         assert len(cache.state.tracks) == 2
-        # Devices should be empty
-        assert cache.state.tracks[0].devices == []
+        # Devices should be empty, and never queried
+        assert cache.state.tracks[0].devices == ()
+        assert mock_client.devices.get_count.calls == []
 
-    @pytest.mark.asyncio
     async def test_refresh_with_devices(self, cache, mock_client):
         """Test refreshing with device info."""
         await cache.refresh(include_devices=True)
@@ -185,42 +232,66 @@ class TestSessionCache:
         assert len(cache.state.tracks) == 2
         assert len(cache.state.tracks[0].devices) == 1
         assert cache.state.tracks[0].devices[0].name == "Drum Rack"
+        assert len(mock_client.devices.get_name.calls) == 2  # One device on each track
 
+    async def test_refresh_skips_failing_track(self, cache, mock_client):
+        """Test a track that fails to load is skipped, not fatal."""
+        def get_volume(track_index):
+            if track_index == 0:
+                raise RuntimeError("timeout")
+            return 0.5
 
-class TestSessionCacheSearch:
-    """Tests for session cache search methods."""
+        mock_client.tracks.get_volume.side_effect = get_volume
+        await cache.refresh(include_devices=False)
 
-    @pytest.fixture
-    def cache_with_tracks(self):
-        """Create cache with pre-populated tracks."""
-        client = MagicMock()
-        cache = SessionCache(client)
+        assert [t.name for t in cache.state.tracks] == ["Bass"]
 
-        cache._state = SessionState(
-            tracks=[
-                CachedTrack(
-                    index=0,
-                    name="Drums",
-                    devices=[
-                        CachedDevice(index=0, name="Drum Rack", class_name="DrumGroupDevice"),
-                    ]
-                ),
-                CachedTrack(
-                    index=1,
-                    name="Bass Synth",
-                    devices=[
-                        CachedDevice(index=0, name="Wavetable", class_name="InstrumentVector"),
-                        CachedDevice(index=1, name="Compressor", class_name="Compressor2"),
-                    ]
-                ),
-                CachedTrack(
-                    index=2,
-                    name="Lead Synth",
-                    devices=[]
-                ),
-            ]
-        )
-        return cache
+    async def test_refresh_track_updates_lookup(self, cache, mock_client):
+        """Test name lookups see a track renamed by refresh_track."""
+        await cache.refresh(include_devices=False)
+        assert cache.find_track_by_name("Drums") is not None
+
+        mock_client.tracks.get_name.side_effect = ("Kick", "Bass").__getitem__
+        await cache.refresh_track(0, include_devices=False)
+
+        assert cache.find_track_by_name("Kick").index == 0
+        assert cache.find_track_by_name("Drums") is None
+
+
+@pytest.fixture(scope="class")
+def cache_with_tracks():
+    """Create cache with pre-populated tracks, shared by the read-only search tests."""
+    cache = SessionCache(make_client())
+
+    cache._state = SessionState(
+        tracks=[
+            CachedTrack(
+                index=0,
+                name="Drums",
+                devices=[
+                    CachedDevice(index=0, name="Drum Rack", class_name="DrumGroupDevice"),
+                ]
+            ),
+            CachedTrack(
+                index=1,
+                name="Bass Synth",
+                devices=[
+                    CachedDevice(index=0, name="Wavetable", class_name="InstrumentVector"),
+                    CachedDevice(index=1, name="Compressor", class_name="Compressor2"),
+                ]
+            ),
+            CachedTrack(
+                index=2,
+                name="Lead Synth",
+                devices=[]
+            ),
+        ]
+    )
+    return cache
+
+
+class TestSessionCacheSearch:
+    """Tests for session cache search methods."""
 
     def test_find_track_exact_match(self, cache_with_tracks):
         """Test finding track by exact name."""
@@ -278,3 +349,85 @@ class TestSessionCacheSearch:
         """Test finding non-existent device."""
         result = cache_with_tracks.find_device_by_name("Serum")
         assert result is None
+
+    def test_find_device_prefers_exact_name(self):
+        """Test an exact device name beats an earlier partial match."""
+        cache = SessionCache(make_client())
+        cache._state = SessionState(
+            tracks=[
+                CachedTrack(index=0, name="Vox", devices=[CachedDevice(index=0, name="Reverb Send")]),
+                CachedTrack(index=1, name="Keys", devices=[CachedDevice(index=0, name="Reverb")]),
+            ]
+        )
+
+        track, device = cache.find_device_by_name("reverb")
+        assert track.name == "Keys"
+        assert device.name == "Reverb"
+
+    def test_find_device_prefers_exact_class_name(self):
+        """Test an exact class name beats an earlier partial class match."""
+        cache = SessionCache(make_client())
+        cache._state = SessionState(
+            tracks=[
+                CachedTrack(index=0, name="Drums", devices=[
+                    CachedDevice(index=0, name="Glue", class_name="GlueCompressor"),
+                ]),
+                CachedTrack(index=1, name="Bass", devices=[
+                    CachedDevice(index=0, name="Comp", class_name="Compressor"),
+                ]),
+            ]
+        )
+
+        track, device = cache.find_device_by_name("compressor")
+        assert (track.name, device.name) == ("Bass", "Comp")
+        track, device = cache.find_device_by_name("compressor", track_name="Drums")
+        assert (track.name, device.name) == ("Drums", "Glue")
+
+    def test_find_device_in_track_prefers_exact_name(self):
+        """Test a track-scoped exact match wins when an earlier track has the same name."""
+        cache = SessionCache(make_client())
+        cache._state = SessionState(
+            tracks=[
+                CachedTrack(index=0, name="Bass", devices=[CachedDevice(index=0, name="EQ")]),
+                CachedTrack(index=1, name="Drums", devices=[
+                    CachedDevice(index=0, name="EQ Eight"),
+                    CachedDevice(index=1, name="EQ"),
+                ]),
+            ]
+        )
+
+        track, device = cache.find_device_by_name("eq", track_name="Drums")
+        assert (track.name, device.index) == ("Drums", 1)
+        track, device = cache.find_device_by_name("eq")
+        assert (track.name, device.index) == ("Bass", 0)
+
+    def test_find_remembers_partial_matches(self, cache_with_tracks):
+        """Test repeated partial lookups return the same result, misses included."""
+        first = cache_with_tracks.find_track_by_name("synth")
+        assert cache_with_tracks.find_track_by_name("SYNTH") is first
+        assert first.name == "Bass Synth"
+
+        assert cache_with_tracks.find_device_by_name("Serum") is None
+        assert cache_with_tracks.find_device_by_name("serum") is None
+        assert ("device", "serum", None) in cache_with_tracks._lookups
+
+    def test_find_caps_remembered_lookups(self):
+        """Test remembered lookups are capped, dropping the oldest first."""
+        cache = SessionCache(make_client())
+        cache._state = SessionState(tracks=[CachedTrack(index=0, name="Drums")])
+        for i in range(LOOKUP_CACHE_SIZE + 1):
+            assert cache.find_track_by_name(f"keys {i}") is None
+
+        assert len(cache._lookups) == LOOKUP_CACHE_SIZE
+        assert ("track", "keys 0") not in cache._lookups
+        assert ("track", f"keys {LOOKUP_CACHE_SIZE}") in cache._lookups
+
+    def test_find_track_after_state_replaced(self):
+        """Test lookups follow a replaced session state."""
+        cache = SessionCache(make_client())
+        cache._state = SessionState(tracks=[CachedTrack(index=0, name="Drums")])
+        assert cache.find_track_by_name("drums").index == 0
+
+        cache._state = SessionState(tracks=[CachedTrack(index=3, name="Drums")])
+        assert cache.find_track_by_name("drums").index == 3
+        assert cache.find_device_by_name("Drum Rack") is None